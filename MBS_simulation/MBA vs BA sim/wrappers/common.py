@@ -4,11 +4,13 @@ This module provides shared functionality for orchestrating MBA vs BA experiment
 including driver invocation, manifest management, CSV aggregation, and delta analysis.
 """
 
+import asyncio
 import json
+import os
 import subprocess
 import sys
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Tuple, Union
 import pandas as pd
 import numpy as np
 from datetime import datetime
@@ -41,6 +43,22 @@ def safe_write_json(path: Union[str, Path], obj: Dict[str, Any]) -> None:
     with open(path, 'w') as f:
         json.dump(obj, f, indent=2, default=_to_python)
 
+DRIVER_TIMEOUT_S = 3600  # 1 hour timeout per driver run
+
+def _driver_cmd(args: Dict[str, Any]) -> List[str]:
+    """Build the unified driver command line from a dictionary of CLI arguments."""
+    cmd = [sys.executable, "unified_driver.py"]
+    
+    for key, value in args.items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            if value:
+                cmd.append(f"--{key}")
+        else:
+            cmd.extend([f"--{key}", str(value)])
+    return cmd
+
 def run_driver(kind: str, args: Dict[str, Any], outdir: str, log: str) -> bool:
     """Run unified driver with specified arguments and capture output.
     
@@ -54,16 +72,7 @@ def run_driver(kind: str, args: Dict[str, Any], outdir: str, log: str) -> bool:
         True if successful, False otherwise
     """
     # Build command
-    cmd = [sys.executable, "unified_driver.py"]
-    
-    for key, value in args.items():
-        if value is None:
-            continue
-        if isinstance(value, bool):
-            if value:
-                cmd.append(f"--{key}")
-        else:
-            cmd.extend([f"--{key}", str(value)])
+    cmd = _driver_cmd(args)
     
     print(f"Running {kind}: {' '.join(cmd)}")
     
@@ -78,7 +87,7 @@ def run_driver(kind: str, args: Dict[str, Any], outdir: str, log: str) -> bool:
                 cwd=str(parent_dir),
                 stdout=f, 
                 stderr=subprocess.STDOUT,
-                timeout=3600  # 1 hour timeout
+                timeout=DRIVER_TIMEOUT_S
             )
         
         success = result.returncode == 0
@@ -92,6 +101,63 @@ def run_driver(kind: str, args: Dict[str, Any], outdir: str, log: str) -> bool:
         print(f"  {kind}: ERROR - {e}")
         return False
 
+async def run_driver_async(kind: str, args: Dict[str, Any], outdir: str, log: str) -> bool:
+    """Asyncio counterpart of run_driver, so several drivers can run side by side."""
+    cmd = _driver_cmd(args)
+    
+    print(f"Running {kind}: {' '.join(cmd)}")
+    
+    try:
+        parent_dir = Path(__file__).parent.parent  # Go up from wrappers to MBA vs BA sim
+        
+        with open(log, 'w') as f:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                cwd=str(parent_dir),
+                stdout=f,
+                stderr=subprocess.STDOUT
+            )
+            try:
+                returncode = await asyncio.wait_for(proc.wait(), timeout=DRIVER_TIMEOUT_S)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                print(f"  {kind}: TIMEOUT after 1 hour")
+                return False
+        
+        success = returncode == 0
+        print(f"  {kind}: {'SUCCESS' if success else 'FAILED'} (exit code: {returncode})")
+        return success
+        
+    except Exception as e:
+        print(f"  {kind}: ERROR - {e}")
+        return False
+
+def run_driver_pair(
+    mba_args: Dict[str, Any], mba_outdir: str, mba_log: str,
+    ba_args: Dict[str, Any], ba_outdir: str, ba_log: str
+) -> Tuple[bool, bool]:
+    """Run the MBA and BA drivers of one cell concurrently.
+    
+    The two simulations share no state and use their own seeds, so they are
+    dispatched as two subprocesses at once instead of BA waiting for MBA.
+    
+    Returns:
+        (mba_success, ba_success)
+    """
+    async def _both():
+        return await asyncio.gather(
+            run_driver_async("MBA", mba_args, mba_outdir, mba_log),
+            run_driver_async("BA", ba_args, ba_outdir, ba_log),
+        )
+    mba_success, ba_success = asyncio.run(_both())
+    return bool(mba_success), bool(ba_success)
+
+def max_cell_workers(requested: int) -> int:
+    """Cap parallel cells so that 2 drivers per cell do not oversubscribe the CPUs."""
+    cpus = os.cpu_count() or 1
+    return max(1, min(int(requested), cpus // 2))
+
 def list_csvs(outdir: str) -> List[str]:
     """Discover CSV files in output directory."""
     outdir = Path(outdir)
@@ -21,8 +21,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 sys.path.insert(0, str(Path(__file__).parent))
 
 from common import (
-    ensure_dir, safe_write_json, run_driver, compute_delta_csv,
-    create_base_manifest, load_json_params, get_permutation_hash
+    ensure_dir, safe_write_json, run_driver_pair, compute_delta_csv,
+    create_base_manifest, load_json_params, get_permutation_hash,
+    max_cell_workers
 )
 
 
@@ -198,7 +199,6 @@ def main():
                 "output_dir": str(mba_dir)
             }
             mba_log = logs_dir / f"mba_{perm_hash}_{run_index}.log"
-            mba_success = run_driver("MBA", mba_args, str(mba_dir), str(mba_log))
 
             # 2) BA
             ba_args = {
@@ -215,7 +215,12 @@ def main():
                 "output_dir": str(ba_dir)
             }
             ba_log = logs_dir / f"ba_{perm_hash}_{run_index}.log"
-            ba_success = run_driver("BA", ba_args, str(ba_dir), str(ba_log))
+
+            # MBA and BA are independent, run them side by side
+            mba_success, ba_success = run_driver_pair(
+                mba_args, str(mba_dir), str(mba_log),
+                ba_args, str(ba_dir), str(ba_log)
+            )
 
             success = bool(mba_success and ba_success)
 
@@ -276,9 +281,11 @@ def main():
             }
             return record, None
 
-    if args.workers and args.workers > 1:
-        print(f"Running in parallel with {args.workers} workers...")
-        with futures.ThreadPoolExecutor(max_workers=args.workers) as ex:
+    # Each cell runs two driver subprocesses, cap cells to half the CPUs
+    workers = max_cell_workers(args.workers) if args.workers else 1
+    if workers > 1:
+        print(f"Running in parallel with {workers} workers...")
+        with futures.ThreadPoolExecutor(max_workers=workers) as ex:
             for rec, srow in ex.map(run_cell, tasks):
                 runs_records.append(rec)
                 if srow is not None:
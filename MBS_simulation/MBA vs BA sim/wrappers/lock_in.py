@@ -20,7 +20,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 sys.path.insert(0, str(Path(__file__).parent))
 
 from common import (
-    ensure_dir, safe_write_json, run_driver, compute_delta_csv,
+    ensure_dir, safe_write_json, run_driver_pair, compute_delta_csv,
     create_base_manifest, load_json_params
 )
 
@@ -183,7 +183,7 @@ def main():
     print(f"  Reps: {base_config['reps']}")
     print()
 
-    # 1) MBA run
+    # 1) MBA and BA runs (independent, dispatched concurrently)
     print("1. Running MBA-only with phase schedule...")
     mba_args = {
         "n_mba": base_config["n_agents"],
@@ -200,20 +200,7 @@ def main():
         "phase_schedule": str(schedule_path),
     }
     mba_log = logs_dir / "mba.log"
-    mba_success = run_driver("MBA", mba_args, str(mba_dir), str(mba_log))
-    manifest["runs"].append({
-        "kind": "MBA",
-        "args": mba_args,
-        "output_dir": str(mba_dir),
-        "log": str(mba_log),
-        "success": bool(mba_success),
-    })
-    if not mba_success:
-        print("ERROR: MBA run failed")
-        safe_write_json(manifest_path, manifest)
-        return False
 
-    # 2) BA run
     print("2. Running BA-only with phase schedule...")
     ba_args = {
         "n_mba": 0,
@@ -230,7 +217,18 @@ def main():
         "phase_schedule": str(schedule_path),
     }
     ba_log = logs_dir / "ba.log"
-    ba_success = run_driver("BA", ba_args, str(ba_dir), str(ba_log))
+
+    mba_success, ba_success = run_driver_pair(
+        mba_args, str(mba_dir), str(mba_log),
+        ba_args, str(ba_dir), str(ba_log)
+    )
+    manifest["runs"].append({
+        "kind": "MBA",
+        "args": mba_args,
+        "output_dir": str(mba_dir),
+        "log": str(mba_log),
+        "success": bool(mba_success),
+    })
     manifest["runs"].append({
         "kind": "BA",
         "args": ba_args,
@@ -238,6 +236,10 @@ def main():
         "log": str(ba_log),
         "success": bool(ba_success),
     })
+    if not mba_success:
+        print("ERROR: MBA run failed")
+        safe_write_json(manifest_path, manifest)
+        return False
     if not ba_success:
         print("ERROR: BA run failed")
         safe_write_json(manifest_path, manifest)
@@ -9,12 +9,19 @@ import sys
 from pathlib import Path
 import pandas as pd
 
+try:
+    import matplotlib
+    # Pin the font family so matplotlib skips font discovery on first draw
+    matplotlib.rcParams['font.family'] = 'DejaVu Sans'
+except ImportError:
+    pass
+
 # Add parent directory to path for imports  
 sys.path.insert(0, str(Path(__file__).parent.parent))
 sys.path.insert(0, str(Path(__file__).parent))
 
 from common import (
-    ensure_dir, safe_write_json, run_driver, compute_delta_csv,
+    ensure_dir, safe_write_json, run_driver_pair, compute_delta_csv,
     create_base_manifest, validate_sanity_gates
 )
 
@@ -73,7 +80,7 @@ def main():
         for d in [eps_dir, mba_dir, ba_dir]:
             ensure_dir(d)
         
-        # Run MBA simulation
+        # MBA simulation args
         mba_args = {
             "n_mba": base_config["n_agents"],
             "n_ba": 0,
@@ -89,13 +96,8 @@ def main():
         }
         
         mba_log = logs_dir / f"mba_eps_{epsilon}.log"
-        mba_success = run_driver("MBA", mba_args, str(mba_dir), str(mba_log))
         
-        if not mba_success:
-            print(f"  ERROR: MBA simulation failed for epsilon={epsilon}")
-            continue
-        
-        # Run BA simulation
+        # BA simulation args
         ba_args = {
             "n_mba": 0,
             "n_ba": base_config["n_agents"],
@@ -111,7 +113,16 @@ def main():
         }
         
         ba_log = logs_dir / f"ba_eps_{epsilon}.log"
-        ba_success = run_driver("BA", ba_args, str(ba_dir), str(ba_log))
+        
+        # Run MBA and BA simulations concurrently
+        mba_success, ba_success = run_driver_pair(
+            mba_args, str(mba_dir), str(mba_log),
+            ba_args, str(ba_dir), str(ba_log)
+        )
+        
+        if not mba_success:
+            print(f"  ERROR: MBA simulation failed for epsilon={epsilon}")
+            continue
         
         if not ba_success:
             print(f"  ERROR: BA simulation failed for epsilon={epsilon}")
@@ -183,31 +194,34 @@ def main():
     try:
         import matplotlib.pyplot as plt
         
-        # Delta vs epsilon plot
-        plt.figure(figsize=(10, 6))
-        plt.plot(summary_df['epsilon'], summary_df['delta_final_mean'], 'bo-', linewidth=2, markersize=8)
-        plt.axhline(y=0, color='k', linestyle='--', alpha=0.5)
-        plt.xlabel('Environmental Noise (ε)')
-        plt.ylabel('Final Delta Fitness (MBA - BA)')
-        plt.title('MBA Advantage vs Environmental Noise')
-        plt.grid(True, alpha=0.3)
-        plt.tight_layout()
-        plt.savefig(plots_dir / "epsilon_sweep.png", dpi=150, bbox_inches='tight')
-        plt.close()
-        
-        # Proportion positive plot
-        plt.figure(figsize=(10, 6))
-        plt.plot(summary_df['epsilon'], summary_df['proportion_final_positive'], 'ro-', linewidth=2, markersize=8)
-        plt.axhline(y=0.5, color='k', linestyle='--', alpha=0.5, label='50% threshold')
-        plt.xlabel('Environmental Noise (ε)')
-        plt.ylabel('Proportion Delta > 0')
-        plt.title('MBA Success Rate vs Environmental Noise')
-        plt.ylim(0, 1)
-        plt.legend()
-        plt.grid(True, alpha=0.3)
-        plt.tight_layout()
-        plt.savefig(plots_dir / "success_rate_sweep.png", dpi=150, bbox_inches='tight')
-        plt.close()
+        # Delta vs epsilon and proportion positive share one figure
+        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(20, 6))
+
+        ax1.plot(summary_df['epsilon'], summary_df['delta_final_mean'], 'bo-', linewidth=2, markersize=8)
+        ax1.axhline(y=0, color='k', linestyle='--', alpha=0.5)
+        ax1.set_xlabel('Environmental Noise (ε)')
+        ax1.set_ylabel('Final Delta Fitness (MBA - BA)')
+        ax1.set_title('MBA Advantage vs Environmental Noise')
+        ax1.grid(True, alpha=0.3)
+
+        ax2.plot(summary_df['epsilon'], summary_df['proportion_final_positive'], 'ro-', linewidth=2, markersize=8)
+        ax2.axhline(y=0.5, color='k', linestyle='--', alpha=0.5, label='50% threshold')
+        ax2.set_xlabel('Environmental Noise (ε)')
+        ax2.set_ylabel('Proportion Delta > 0')
+        ax2.set_title('MBA Success Rate vs Environmental Noise')
+        ax2.set_ylim(0, 1)
+        ax2.legend()
+        ax2.grid(True, alpha=0.3)
+
+        fig.tight_layout()
+        # One render, then each panel is cropped out to its own file as before
+        fig.canvas.draw()
+        renderer = fig.canvas.get_renderer()
+        to_inches = fig.dpi_scale_trans.inverted()
+        for ax, name in ((ax1, "epsilon_sweep.png"), (ax2, "success_rate_sweep.png")):
+            bbox = ax.get_tightbbox(renderer).transformed(to_inches).padded(0.1)
+            fig.savefig(plots_dir / name, dpi=150, bbox_inches=bbox)
+        plt.close(fig)
         
         print(f"Summary plots saved to: {plots_dir}")
         
@@ -12,6 +12,7 @@ import sys
 import itertools
 from pathlib import Path
 from typing import List, Dict, Any
+import numpy as np
 import pandas as pd
 
 # Add parent directory to path for imports
@@ -19,7 +20,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 sys.path.insert(0, str(Path(__file__).parent))
 
 from common import (
-    ensure_dir, safe_write_json, run_driver, compute_delta_csv,
+    ensure_dir, safe_write_json, run_driver_pair, compute_delta_csv,
     create_base_manifest, get_permutation_hash
 )
 
@@ -80,6 +81,13 @@ def main():
     if base_config["n_permutations"] < len(all_perms):
         all_perms = all_perms[: base_config["n_permutations"]]
 
+    # Per-permutation topology metrics in one vectorized pass over the (N, 5) matrix
+    perms = np.array(all_perms, dtype=np.int8)
+    hamming = (perms != np.arange(5)).sum(axis=1)
+    p3_slots = np.argmax(perms == 3, axis=1)
+    p1_masks = (perms == 0) | (perms == 4)
+    p1_slots_list = [np.nonzero(m)[0].tolist() for m in p1_masks]
+
     summary_rows: List[Dict[str, Any]] = []
     n_total = len(all_perms)
 
@@ -111,18 +119,6 @@ def main():
             "output_dir": str(mba_dir)
         }
         mba_log = logs_dir / f"mba_{perm_hash}.log"
-        mba_success = run_driver("MBA", mba_args, str(mba_dir), str(mba_log))
-        if not mba_success:
-            print(f"  ERROR: MBA run failed for perm={perm_str}")
-            manifest["runs"].append({
-                "kind": "MBA", "args": mba_args, "output_dir": str(mba_dir),
-                "log": str(mba_log), "success": False
-            })
-            continue
-        manifest["runs"].append({
-            "kind": "MBA", "args": mba_args, "output_dir": str(mba_dir),
-            "log": str(mba_log), "success": True
-        })
 
         # 2) BA run
         ba_args = {
@@ -139,18 +135,25 @@ def main():
             "output_dir": str(ba_dir)
         }
         ba_log = logs_dir / f"ba_{perm_hash}.log"
-        ba_success = run_driver("BA", ba_args, str(ba_dir), str(ba_log))
-        if not ba_success:
-            print(f"  ERROR: BA run failed for perm={perm_str}")
-            manifest["runs"].append({
-                "kind": "BA", "args": ba_args, "output_dir": str(ba_dir),
-                "log": str(ba_log), "success": False
-            })
-            continue
+
+        mba_success, ba_success = run_driver_pair(
+            mba_args, str(mba_dir), str(mba_log),
+            ba_args, str(ba_dir), str(ba_log)
+        )
+        manifest["runs"].append({
+            "kind": "MBA", "args": mba_args, "output_dir": str(mba_dir),
+            "log": str(mba_log), "success": bool(mba_success)
+        })
         manifest["runs"].append({
             "kind": "BA", "args": ba_args, "output_dir": str(ba_dir),
-            "log": str(ba_log), "success": True
+            "log": str(ba_log), "success": bool(ba_success)
         })
+        if not mba_success:
+            print(f"  ERROR: MBA run failed for perm={perm_str}")
+            continue
+        if not ba_success:
+            print(f"  ERROR: BA run failed for perm={perm_str}")
+            continue
 
         # 3) Delta analysis per permutation
         try:
@@ -160,14 +163,14 @@ def main():
                 None,  # no per-permutation plots
                 window_last_days=200
             )
-            slots = p_slots(perm)
+            p1_slots = p1_slots_list[idx - 1]
             row = {
                 "perm": perm_str,
                 "perm_hash": perm_hash,
-                "hamming_to_canon": hamming_to_canon(perm),
-                "p3_slot": slots["p3_slot"],
-                "p1_slot_a": slots["p1_slots"][0] if len(slots["p1_slots"]) > 0 else None,
-                "p1_slot_b": slots["p1_slots"][1] if len(slots["p1_slots"]) > 1 else None,
+                "hamming_to_canon": int(hamming[idx - 1]),
+                "p3_slot": int(p3_slots[idx - 1]),
+                "p1_slot_a": p1_slots[0] if len(p1_slots) > 0 else None,
+                "p1_slot_b": p1_slots[1] if len(p1_slots) > 1 else None,
                 "delta_mean": delta_stats["delta_mean"],
                 "delta_final_mean": delta_stats["delta_final_mean"],
                 "delta_std": delta_stats["delta_std"],
@@ -1,10 +1,20 @@
 # led_controller.py - LED Pair PWM Controller
 from machine import Pin, PWM
 import utime
+try:
+    from ucollections import deque
+except ImportError:
+    from collections import deque
 
 class LEDController:
     """Controls LED pair with PWM and duration-based operation."""
     
+    # Status prints block on the REPL UART; keep them off in production
+    DEBUG = False
+    
+    # Percent (0-100) -> 10-bit PWM duty, precomputed to keep float math off the hot path
+    _DUTY_LUT = tuple((i * 1023) // 100 for i in range(101))
+    
     def __init__(self, pin, frequency=1000):
         """
         Initialize LED controller.
@@ -20,33 +30,66 @@ class LEDController:
         self.pwm = PWM(Pin(pin, Pin.OUT))
         self.pwm.freq(frequency)
         self.pwm.duty(0)  # Start off
+        self._pwm_duty = self.pwm.duty  # Bound method, one lookup per duty write
+        
+        # Bound timer functions (avoid module attribute lookups on every tick)
+        self._ticks_ms = utime.ticks_ms
+        self._ticks_diff = utime.ticks_diff
+        self._ticks_add = utime.ticks_add
         
         # State tracking
         self.current_duty = 0  # Current PWM duty cycle (0-100%)
         self.is_on = False
         self.start_time = 0
-        self.target_duration = 0
-        self.total_on_time_sec = 0  # Total time LED has been on
+        self._deadline = 0  # Absolute ticks_ms at which to turn off (0 = indefinite)
+        
+        # Pulse train state, advanced from update()
+        self._pulse_remaining = 0
+        self._pulse_duty = 0
+        self._pulse_on_sec = 0
+        self._pulse_period_ms = 0
+        self._next_pulse_ms = 0
+        self.total_on_time_ms = 0  # Total time LED has been on (integer ms)
+        
+        # Status dict reused by get_status() to avoid a heap allocation per poll
+        self._status = {
+            "duty_percent": 0,
+            "is_on": False,
+            "current_on_time_sec": 0.0,
+            "total_on_time_sec": 0.0,
+            "target_duration_sec": 0
+        }
         
         print(f"[LED] Initialized on GPIO {pin} @ {frequency}Hz")
     
     def set_duty(self, duty_percent):
         """Set PWM duty cycle (0-100%)."""
-        duty_percent = max(0, min(100, duty_percent))  # Clamp to valid range
+        # Clamp to valid range
+        if duty_percent < 0:
+            duty_percent = 0
+        elif duty_percent > 100:
+            duty_percent = 100
         
         # Convert percentage to PWM duty value (0-1023 for 10-bit)
-        pwm_duty = int((duty_percent / 100.0) * 1023)
-        
-        self.pwm.duty(pwm_duty)
+        self._pwm_duty(self._DUTY_LUT[int(duty_percent)])
         self.current_duty = duty_percent
         
         if duty_percent > 0:
             if not self.is_on:
-                self.start_time = utime.ticks_ms()
+                self.start_time = self._ticks_ms()
                 self.is_on = True
         else:
             self.turn_off()
     
+    def set_duty_fast(self, duty_percent):
+        """Set a non-zero duty already validated as an int in 1-100 (no clamping)."""
+        self._pwm_duty(self._DUTY_LUT[duty_percent])
+        self.current_duty = duty_percent
+        
+        if not self.is_on:
+            self.start_time = self._ticks_ms()
+            self.is_on = True
+    
     def turn_on(self, duty_percent, duration_sec=0):
         """
         Turn on LED with specified duty cycle.
@@ -55,13 +98,14 @@ class LEDController:
             duty_percent: PWM duty cycle (0-100%)
             duration_sec: Duration to stay on (0 = indefinite)
         """
-        self.target_duration = duration_sec * 1000 if duration_sec > 0 else 0  # Convert to ms
+        self._deadline = self._ticks_add(self._ticks_ms(), int(duration_sec * 1000)) if duration_sec > 0 else 0
         self.set_duty(duty_percent)
         
-        if duration_sec > 0:
-            print(f"[LED] On: {duty_percent}% for {duration_sec}s")
-        else:
-            print(f"[LED] On: {duty_percent}% (indefinite)")
+        if self.DEBUG:
+            if duration_sec > 0:
+                print(f"[LED] On: {duty_percent}% for {duration_sec}s")
+            else:
+                print(f"[LED] On: {duty_percent}% (indefinite)")
         
         return True
     
@@ -69,69 +113,79 @@ class LEDController:
         """Turn off LED and update on-time tracking."""
         if self.is_on:
             # Calculate total on time
-            elapsed_ms = utime.ticks_diff(utime.ticks_ms(), self.start_time)
-            self.total_on_time_sec += elapsed_ms / 1000.0
+            elapsed_ms = self._ticks_diff(self._ticks_ms(), self.start_time)
+            self.total_on_time_ms += elapsed_ms
             
-            print(f"[LED] Off. On time: {elapsed_ms/1000.0:.1f}s (Total: {self.total_on_time_sec:.1f}s)")
+            if self.DEBUG:
+                print(f"[LED] Off. On time: {elapsed_ms/1000.0:.1f}s (Total: {self.total_on_time_ms/1000.0:.1f}s)")
         
-        self.pwm.duty(0)
+        self._pwm_duty(0)
         self.current_duty = 0
         self.is_on = False
         self.start_time = 0
-        self.target_duration = 0
+        self._deadline = 0
     
     def update(self):
         """Update LED state - call periodically to handle duration timeout."""
-        if not self.is_on or self.target_duration == 0:
-            return
-        
-        elapsed_ms = utime.ticks_diff(utime.ticks_ms(), self.start_time)
-        
-        # Check if duration expired
-        if elapsed_ms >= self.target_duration:
+        # Single check: a deadline is only set while a timed command is running
+        if self._deadline and self._ticks_diff(self._ticks_ms(), self._deadline) >= 0:
             self.turn_off()
+        
+        # Start the next pulse of an active pulse train
+        if self._pulse_remaining and self._ticks_diff(self._ticks_ms(), self._next_pulse_ms) >= 0:
+            self._pulse_remaining -= 1
+            self._next_pulse_ms = self._ticks_add(self._ticks_ms(), self._pulse_period_ms)
+            self.turn_on(self._pulse_duty, self._pulse_on_sec)
     
     def pulse(self, duty_percent, pulse_duration_sec, pulse_count=1, pulse_interval_sec=0.5):
         """
         Create pulsing pattern (for future use).
-        Note: This is a blocking operation for simplicity.
+        Non-blocking: the first pulse starts now, the rest are driven by update().
         """
-        for i in range(pulse_count):
-            self.turn_on(duty_percent)
-            utime.sleep(pulse_duration_sec)
-            self.turn_off()
-            
-            if i < pulse_count - 1:  # Don't wait after last pulse
-                utime.sleep(pulse_interval_sec)
+        self._pulse_duty = duty_percent
+        self._pulse_on_sec = pulse_duration_sec
+        self._pulse_period_ms = int((pulse_duration_sec + pulse_interval_sec) * 1000)
+        self._pulse_remaining = pulse_count
+        self._next_pulse_ms = self._ticks_ms()
+        self.update()
     
     def get_status(self):
-        """Get LED status dictionary."""
+        """Get LED status dictionary.
+        
+        The returned dict is shared and refreshed on every call; copy it if
+        a snapshot must be kept.
+        """
         current_on_time = 0.0
+        target_duration = 0
         
         if self.is_on:
-            current_on_time = utime.ticks_diff(utime.ticks_ms(), self.start_time) / 1000.0
-        
-        return {
-            "duty_percent": self.current_duty,
-            "is_on": self.is_on,
-            "current_on_time_sec": current_on_time,
-            "total_on_time_sec": self.total_on_time_sec,
-            "target_duration_sec": self.target_duration / 1000.0 if self.target_duration > 0 else 0
-        }
+            current_on_time = self._ticks_diff(self._ticks_ms(), self.start_time) / 1000.0
+            if self._deadline:
+                target_duration = self._ticks_diff(self._deadline, self.start_time)
+        
+        status = self._status
+        status["duty_percent"] = self.current_duty
+        status["is_on"] = self.is_on
+        status["current_on_time_sec"] = current_on_time
+        status["total_on_time_sec"] = self.total_on_time_ms / 1000.0
+        status["target_duration_sec"] = target_duration / 1000.0 if target_duration > 0 else 0
+        return status
     
     def reset_on_time(self):
         """Reset total on-time counter."""
-        old_time = self.total_on_time_sec
-        self.total_on_time_sec = 0.0
-        print(f"[LED] On-time counter reset (was {old_time:.1f}s)")
+        old_time_ms = self.total_on_time_ms
+        self.total_on_time_ms = 0
+        if self.DEBUG:
+            print(f"[LED] On-time counter reset (was {old_time_ms/1000.0:.1f}s)")
     
     def emergency_stop(self):
         """Emergency stop - immediate shutdown."""
-        self.pwm.duty(0)
+        self._pwm_duty(0)
         self.current_duty = 0
         self.is_on = False
         self.start_time = 0
-        self.target_duration = 0
+        self._deadline = 0
+        self._pulse_remaining = 0
         print("[LED] EMERGENCY STOP")
 
 
@@ -142,29 +196,39 @@ class QueuedLEDController(LEDController):
     
     def __init__(self, pin, frequency=1000, max_queue=5):
         super().__init__(pin, frequency)
-        self.command_queue = []
+        self.command_queue = deque((), max_queue)  # O(1) FIFO
         self.max_queue = max_queue
         self.current_command = None
+        self._cmd_seq = 0  # Monotonic id for commands queued without one
+        self._status["queue_length"] = 0
+        self._status["current_command_id"] = None
     
     def queue_command(self, duty_percent, duration_sec, command_id=None):
         """Queue an LED command."""
         if len(self.command_queue) >= self.max_queue:
-            print("[LED] Queue full")
+            if self.DEBUG:
+                print("[LED] Queue full")
             return False
         
-        # Validate parameters
-        duty_percent = max(0, min(100, duty_percent))
+        # Validate parameters once here; dispatch in update() trusts them
+        duty_percent = int(max(0, min(100, duty_percent)))
         duration_sec = max(0, min(3600, duration_sec))  # Max 1 hour
         
+        if command_id is None:
+            self._cmd_seq += 1
+            command_id = self._cmd_seq
+        
         command = {
             "duty": duty_percent,
             "duration": duration_sec,
-            "command_id": command_id or f"led_cmd_{utime.ticks_ms()}",
-            "queued_time": utime.ticks_ms()
+            "duration_ms": int(duration_sec * 1000),
+            "command_id": command_id,
+            "queued_time": self._ticks_ms()
         }
         
         self.command_queue.append(command)
-        print(f"[LED] Queued: {duty_percent}% for {duration_sec}s")
+        if self.DEBUG:
+            print(f"[LED] Queued: {duty_percent}% for {duration_sec}s")
         return True
     
     def update(self):
@@ -172,24 +236,46 @@ class QueuedLEDController(LEDController):
         # Call parent update for duration handling
         super().update()
         
-        # Start next queued command if LED is off
-        if not self.is_on and self.command_queue:
-            self.current_command = self.command_queue.pop(0)  # FIFO
-            self.turn_on(self.current_command["duty"], self.current_command["duration"])
+        # Start next queued command once the LED is off and no wait is pending
+        if not self.is_on and not self._deadline and self.command_queue:
+            command = self.command_queue.popleft()  # FIFO
+            self.current_command = command
+            duration_ms = command["duration_ms"]
+            self._deadline = self._ticks_add(self._ticks_ms(), duration_ms) if duration_ms > 0 else 0
+            # Zero-duty command just holds the LED off until the deadline
+            if command["duty"] > 0:
+                self.set_duty_fast(command["duty"])
+    
+    def pulse(self, duty_percent, pulse_duration_sec, pulse_count=1, pulse_interval_sec=0.5):
+        """
+        Queue a pulsing pattern as on/off commands, run cooperatively by update().
+        
+        Returns:
+            False if the queue cannot hold the whole pulse train
+        """
+        needed = 2 * pulse_count - 1  # No wait after the last pulse
+        if len(self.command_queue) + needed > self.max_queue:
+            if self.DEBUG:
+                print("[LED] Queue full")
+            return False
+        
+        for i in range(pulse_count):
+            self.queue_command(duty_percent, pulse_duration_sec)
+            if i < pulse_count - 1:
+                self.queue_command(0, pulse_interval_sec)
+        return True
     
     def get_status(self):
         """Get enhanced status with queue information."""
         status = super().get_status()
-        status.update({
-            "queue_length": len(self.command_queue),
-            "current_command_id": self.current_command.get("command_id") if self.current_command else None
-        })
+        status["queue_length"] = len(self.command_queue)
+        status["current_command_id"] = self.current_command["command_id"] if self.current_command else None
         return status
     
     def emergency_stop(self):
         """Emergency stop - clear queue and stop LED."""
         super().emergency_stop()
-        self.command_queue.clear()
+        self.command_queue = deque((), self.max_queue)
         self.current_command = None
         print("[LED] EMERGENCY STOP - Queue cleared")
 
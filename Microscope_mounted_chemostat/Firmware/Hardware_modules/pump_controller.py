@@ -1,6 +1,63 @@
 # pump_controller.py - Peristaltic Pump PWM Controller
 from machine import Pin, PWM
 import utime
+from array import array
+try:
+    from ucollections import deque
+except ImportError:
+    from collections import deque
+try:
+    import micropython
+    from micropython import const
+    _MICROPYTHON = True
+except ImportError:
+    # CPython (host tests/tools): @micropython.native/viper are compiler
+    # directives on the device, so stand in identity decorators here
+    class micropython:
+        @staticmethod
+        def native(func):
+            return func
+        viper = native
+    def const(value):
+        return value
+    _MICROPYTHON = False
+
+# Per-command trace prints (start/stop/queue). const(0) lets the MicroPython
+# compiler drop these branches entirely; set to const(1) when debugging.
+# The runtime `debug` flag still controls the one-off init/config messages.
+_DEBUG = const(0)
+
+_SEC_TO_HR = 1.0 / 3600.0
+
+if _MICROPYTHON:
+    # Viper kernel (ptr32/ptr8 exist only under the MicroPython compiler)
+    @micropython.viper
+    def _find_expired(now: int, deadlines, running, n: int) -> int:
+        """Bitmask of running pumps whose deadline has passed (bit i = pump i+1).
+        
+        Inlines utime.ticks_diff(now, deadline) >= 0 for the ESP32 30-bit tick period.
+        """
+        d = ptr32(deadlines)
+        r = ptr8(running)
+        mask = 0
+        i = 0
+        while i < n:
+            if r[i] and ((now - d[i] + 0x20000000) & 0x3FFFFFFF) >= 0x20000000:
+                mask |= 1 << i
+            i += 1
+        return mask
+else:
+    def _find_expired(now, deadlines, running, n):
+        """Bitmask of running pumps whose deadline has passed (bit i = pump i+1)."""
+        mask = 0
+        for i in range(n):
+            if running[i] and utime.ticks_diff(now, deadlines[i]) >= 0:
+                mask |= 1 << i
+        return mask
+
+def _warn_if_stalled(pump_ids):
+    """Print one stall warning line for pumps with a zero calibration slope."""
+    print(f"[Pump{','.join(str(p) for p in pump_ids)}] WARNING: Zero calibration coefficient - pump may be stalled")
 
 class PumpController:
     """Controls a single peristaltic pump with PWM, calibration, and volume tracking."""
@@ -21,51 +78,65 @@ class PumpController:
         self.frequency = frequency
         self.debug = debug
         
-        # Initialize PWM
-        self.pwm = PWM(Pin(pin, Pin.OUT))
-        self.pwm.freq(frequency)
-        self.pwm.duty(0)  # Start stopped
+        # Initialize PWM. Passing freq to the constructor lets the ESP32 port bind
+        # the channel to an existing LEDC timer already running at this frequency
+        # (shared across the bank) instead of reconfiguring a timer per pump.
+        try:
+            self.pwm = PWM(Pin(pin, Pin.OUT), freq=frequency)
+        except TypeError:
+            # Older ports without constructor keywords
+            self.pwm = PWM(Pin(pin, Pin.OUT))
+            self.pwm.freq(frequency)
+        
+        # Resolve the PWM API once: 16-bit builds (RP2040, some ESP32) vs 10-bit duty().
+        # This is the only hasattr probe; every duty write goes through _set_raw.
+        self._use_u16 = hasattr(self.pwm, "duty_u16")
+        if self._use_u16:
+            self._set_raw = self.pwm.duty_u16
+            self._duty_scale = 65535 / 100.0  # Full 16-bit range, no 10-bit truncation
+        else:
+            self._set_raw = self.pwm.duty
+            self._duty_scale = 1023 / 100.0
+        self._set_raw(0)  # Start stopped
         
         # Store calibration coefficients as direct floats for performance
         calib = calibration or {"a": 2.5, "b": 0.0}
         self.calib_a = float(calib["a"])
         self.calib_b = float(calib["b"])
         
-        # Warn if pump appears stalled
+        # Warn once at init if pump appears stalled
         if self.calib_a == 0.0:
-            print(f"[Pump{pump_id}] WARNING: Zero calibration coefficient - pump may be stalled")
+            _warn_if_stalled((pump_id,))
         
         # State tracking
         self.current_duty = 0  # Current PWM duty cycle (0-100%)
         self.is_running = False
         self.start_time = 0
         self.target_duration = 0
+        self.deadline_ms = 0  # Absolute ticks_ms at which the current run ends
         self.total_volume_ml = 0.0  # Total volume dispensed since boot
+        self._current_rate_ml_h = 0.0  # calib_a * current_duty + calib_b while running
+        self._on_start = None  # Set by an owning PumpBank so direct starts reach its scheduler
         
         if self.debug:
             print(f"[Pump{pump_id}] Initialized on GPIO {pin} @ {frequency}Hz (calib: {self.calib_a:.3f}*PWM + {self.calib_b:.3f})")
     
+    @micropython.native
     def set_duty(self, duty_percent):
         """Set PWM duty cycle (0-100%) with build compatibility."""
-        duty_percent = max(0, min(100, duty_percent))  # Clamp to valid range
-        
-        # Convert percentage to PWM duty value
-        pwm_val = int((duty_percent / 100.0) * 1023)
+        duty_percent = 0 if duty_percent < 0 else (100 if duty_percent > 100 else duty_percent)  # Clamp to valid range
         
-        # Handle different MicroPython PWM builds
-        if hasattr(self.pwm, "duty_u16"):
-            # 16-bit builds (RP2040 and some ESP32 builds)
-            self.pwm.duty_u16(pwm_val << 6)  # Scale 10-bit to 16-bit
-        else:
-            # 10-bit builds (standard ESP32)
-            self.pwm.duty(pwm_val)
+        # Convert percentage to raw PWM value for this build
+        self._set_raw(int(duty_percent * self._duty_scale))
         
         self.current_duty = duty_percent
         
         if duty_percent > 0:
+            self._current_rate_ml_h = self.calib_a * duty_percent + self.calib_b
             if not self.is_running:
                 self.start_time = utime.ticks_ms()
                 self.is_running = True
+            self.deadline_ms = utime.ticks_add(self.start_time, self.target_duration)
         else:
             self.stop()
     
@@ -79,19 +150,37 @@ class PumpController:
     def start(self, duty_percent, duration_sec):
         """Start pump with specified duty cycle for duration."""
         # Validate parameters at start() level too
-        duty_percent = max(0, min(100, duty_percent))
-        duration_sec = max(0, min(3600, duration_sec))  # Max 1 hour safety
+        duty_percent = 0 if duty_percent < 0 else (100 if duty_percent > 100 else duty_percent)
+        duration_sec = 0 if duration_sec < 0 else (3600 if duration_sec > 3600 else duration_sec)  # Max 1 hour safety
         
         # Reject no-op commands early
         if duration_sec == 0 or duty_percent == 0:
-            if self.debug:
+            if _DEBUG:
                 print(f"[Pump{self.pump_id}] Rejected no-op command: {duty_percent}% for {duration_sec}s")
             return False
-            
-        self.target_duration = duration_sec * 1000  # Convert to ms
-        self.set_duty(duty_percent)
         
-        if self.debug:
+        started = self._start_unchecked(duty_percent, duration_sec)
+        if self._on_start is not None:
+            self._on_start()  # Owner must re-check deadlines on its next update
+        return started
+    
+    @micropython.native
+    def _start_unchecked(self, duty_percent, duration_sec):
+        """Start with duty in (0, 100] and duration in (0, 3600] already validated.
+        
+        Used by PumpBank for queued commands, which queue_command has checked.
+        """
+        self.target_duration = int(duration_sec * 1000)  # Convert to ms (ticks_add needs int)
+        self._set_raw(int(duty_percent * self._duty_scale))
+        self.current_duty = duty_percent
+        self._current_rate_ml_h = self.calib_a * duty_percent + self.calib_b
+        
+        if not self.is_running:
+            self.start_time = utime.ticks_ms()
+            self.is_running = True
+        self.deadline_ms = utime.ticks_add(self.start_time, self.target_duration)
+        
+        if _DEBUG:
             print(f"[Pump{self.pump_id}] Started: {duty_percent}% for {duration_sec}s")
         return True
     
@@ -100,62 +189,63 @@ class PumpController:
         if self.is_running:
             # Calculate volume dispensed using proper tick difference
             elapsed_ms = utime.ticks_diff(utime.ticks_ms(), self.start_time)
-            volume_dispensed = self.calculate_volume(self.current_duty, elapsed_ms / 1000.0)
+            volume_dispensed = max(0.0, self._current_rate_ml_h * elapsed_ms * (_SEC_TO_HR / 1000.0))
             self.total_volume_ml += volume_dispensed
             
-            if self.debug:
+            if _DEBUG:
                 print(f"[Pump{self.pump_id}] Stopped. Volume: {volume_dispensed:.3f}ml (Total: {self.total_volume_ml:.3f}ml)")
         
-        # Set duty to zero using same compatibility logic
-        if hasattr(self.pwm, "duty_u16"):
-            self.pwm.duty_u16(0)
-        else:
-            self.pwm.duty(0)
-            
+        self._set_raw(0)
+        
         self.current_duty = 0
+        self._current_rate_ml_h = 0.0
         self.is_running = False
         self.start_time = 0
         self.target_duration = 0
+        self.deadline_ms = 0
     
-    def update(self):
-        """Update pump state - call periodically to handle duration timeout."""
+    @micropython.native
+    def update(self, now=None):
+        """Update pump state - call periodically to handle duration timeout.
+        
+        Args:
+            now: Optional ticks_ms snapshot shared across a bank update
+        """
         if not self.is_running:
             return
         
-        elapsed_ms = utime.ticks_diff(utime.ticks_ms(), self.start_time)
+        if now is None:
+            now = utime.ticks_ms()
         
         # Check if duration expired
-        if elapsed_ms >= self.target_duration:
+        if utime.ticks_diff(now, self.deadline_ms) >= 0:
             self.stop()
     
+    @micropython.native
     def calculate_volume(self, duty_percent, duration_sec):
         """Calculate volume dispensed based on calibration (optimized)."""
-        if duration_sec <= 0:
-            return 0.0
-        
-        # ml/h = a * PWM% + b (using direct float access)
-        flow_rate_ml_per_hour = (self.calib_a * duty_percent) + self.calib_b
-        
-        # Convert to ml for the given duration
-        volume_ml = flow_rate_ml_per_hour * (duration_sec / 3600.0)
-        
-        return max(0.0, volume_ml)  # Never negative
+        # ml/h = a * PWM% + b, scaled to ml; max() covers zero/negative durations
+        return max(0.0, (self.calib_a * duty_percent + self.calib_b) * duration_sec * _SEC_TO_HR)
     
     def get_current_volume_rate(self):
         """Get current volume dispensing rate in ml/h."""
-        if not self.is_running:
-            return 0.0
-        
-        return (self.calib_a * self.current_duty) + self.calib_b
+        return self._current_rate_ml_h
     
-    def set_calibration(self, a, b):
-        """Update calibration coefficients with validation."""
+    def set_calibration(self, a, b, warn=True):
+        """Update calibration coefficients with validation.
+        
+        Args:
+            warn: Print the stall warning here; PumpBank passes False and
+                  reports all stalled pumps in one line instead
+        """
         self.calib_a = float(a)
         self.calib_b = float(b)
+        if self.is_running:
+            self._current_rate_ml_h = self.calib_a * self.current_duty + self.calib_b
         
         # Warn if pump appears stalled
-        if self.calib_a == 0.0:
-            print(f"[Pump{self.pump_id}] WARNING: Zero calibration coefficient - pump may be stalled")
+        if warn and self.calib_a == 0.0:
+            _warn_if_stalled((self.pump_id,))
         
         if self.debug:
             print(f"[Pump{self.pump_id}] Calibration updated: ml/h = {self.calib_a:.3f}*PWM% + {self.calib_b:.3f}")
@@ -171,40 +261,53 @@ class PumpController:
         if self.debug:
             print(f"[Pump{self.pump_id}] Volume counter reset (was {old_volume:.3f}ml)")
     
+    def _volume_in_progress(self):
+        """Volume dispensed so far by the current run (ml)."""
+        if not self.is_running:
+            return 0.0
+        elapsed_ms = utime.ticks_diff(utime.ticks_ms(), self.start_time)
+        return max(0.0, self._current_rate_ml_h * elapsed_ms * (_SEC_TO_HR / 1000.0))
+    
     def get_status(self):
         """Get pump status dictionary."""
-        current_volume_in_progress = 0.0
-        
-        if self.is_running:
-            elapsed_sec = utime.ticks_diff(utime.ticks_ms(), self.start_time) / 1000.0
-            current_volume_in_progress = self.calculate_volume(self.current_duty, elapsed_sec)
-        
         return {
             "pump_id": self.pump_id,
             "duty_percent": self.current_duty,
             "is_running": self.is_running,
             "total_volume_ml": self.total_volume_ml,
-            "current_volume_ml": current_volume_in_progress,
-            "flow_rate_ml_h": self.get_current_volume_rate(),
-            "calibration": self.get_calibration()
+            "current_volume_ml": self._volume_in_progress(),
+            "flow_rate_ml_h": self._current_rate_ml_h,
+            "calibration": {"a": self.calib_a, "b": self.calib_b}
+        }
+    
+    def _build_status(self, queue_length):
+        """Status dictionary including the bank's queue length, built in one literal."""
+        return {
+            "pump_id": self.pump_id,
+            "duty_percent": self.current_duty,
+            "is_running": self.is_running,
+            "total_volume_ml": self.total_volume_ml,
+            "current_volume_ml": self._volume_in_progress(),
+            "flow_rate_ml_h": self._current_rate_ml_h,
+            "calibration": {"a": self.calib_a, "b": self.calib_b},
+            "queue_length": queue_length
         }
     
     def emergency_stop(self):
         """Emergency stop - immediate shutdown with PWM deinit."""
         try:
             # Immediate PWM shutdown
-            if hasattr(self.pwm, "duty_u16"):
-                self.pwm.duty_u16(0)
-            else:
-                self.pwm.duty(0)
+            self._set_raw(0)
             
             # Release PWM pin for clean restart
             self.pwm.deinit()
             
             self.current_duty = 0
+            self._current_rate_ml_h = 0.0
             self.is_running = False
             self.start_time = 0
             self.target_duration = 0
+            self.deadline_ms = 0
             
             print(f"[Pump{self.pump_id}] EMERGENCY STOP - PWM deinitialized")
             
@@ -217,7 +320,7 @@ class PumpController:
 class PumpBank:
     """Controls multiple pumps with command queuing and coordination."""
     
-    def __init__(self, pump_pins, calibrations=None, frequency=1000, debug=False):
+    def __init__(self, pump_pins, calibrations=None, frequency=1000, debug=False, max_queue=5):
         """
         Initialize pump bank.
         
@@ -226,60 +329,106 @@ class PumpBank:
             calibrations: Dict of calibration coefficients per pump
             frequency: PWM frequency
             debug: Enable debug printing
+            max_queue: Capacity of each pump's command queue
         """
-        self.pumps = {}
-        self.command_queues = {}
+        self.max_queue = max_queue
         self.debug = debug
         
-        # Initialize individual pumps
-        for i, pin in enumerate(pump_pins):
-            pump_id = i + 1
-            calib = calibrations.get(pump_id) if calibrations else None
-            
-            self.pumps[pump_id] = PumpController(pin, pump_id, frequency, calib, debug)
-            self.command_queues[pump_id] = []  # FIFO queue for each pump
+        # Pumps and their FIFO queues are indexed by pump_id - 1 (ids are 1..N)
+        self._pumps = tuple(
+            PumpController(pin, i + 1, frequency,
+                           calibrations.get(i + 1) if calibrations else None, debug)
+            for i, pin in enumerate(pump_pins)
+        )
+        self._queues = tuple(deque((), max_queue) for _ in self._pumps)  # O(1) FIFO per pump
+        self._n_pumps = len(self._pumps)
+        
+        # Parallel (pump, queue) pairs so update_all() avoids indexing
+        self._pump_queue_pairs = tuple(zip(self._pumps, self._queues))
+        
+        # Per-pump deadline/running state as flat arrays (index = pump_id - 1)
+        # so update_all() can find expired runs in one _find_expired() call
+        self._deadlines = array('i', [0] * self._n_pumps)
+        self._running = array('b', [0] * self._n_pumps)
+        
+        # Status snapshot as parallel arrays (index = pump_id - 1), refreshed in
+        # place by get_status_arrays() so the 1 Hz publish allocates no dicts
+        self.duty = array('f', [0] * self._n_pumps)
+        self.total_volume = array('f', [0] * self._n_pumps)
+        self.queue_len = array('H', [0] * self._n_pumps)
+        self.running_mask = 0  # bit i set while pump i+1 is running
+        
+        # Nearest deadline among running pumps (None when all are idle), and a
+        # flag set when a command is queued; update_all() skips ticks with neither
+        self._min_deadline = None
+        self._dispatch_pending = False
+        
+        # A pump started directly (get_pump(n).start(...)) bypasses the queue,
+        # so it flags the bank too; otherwise update_all() would skip its deadline
+        for pump in self._pumps:
+            pump._on_start = self._mark_dirty
         
         if self.debug:
-            print(f"[PumpBank] Initialized {len(self.pumps)} pumps")
+            print(f"[PumpBank] Initialized {self._n_pumps} pumps")
+    
+    def _mark_dirty(self):
+        """Force the next update_all() to run a full per-pump pass."""
+        self._dispatch_pending = True
+    
+    def _valid_id(self, pump_id):
+        """True if pump_id names a pump in this bank."""
+        return isinstance(pump_id, int) and 1 <= pump_id <= self._n_pumps
+    
+    def get_pump(self, pump_id):
+        """Return the PumpController for pump_id (1-based), or None."""
+        return self._pumps[pump_id - 1] if self._valid_id(pump_id) else None
     
     def queue_command(self, pump_id, duty_percent, duration_sec, command_id=None, max_queue=5):
         """Queue a pump command with enhanced validation."""
-        if pump_id not in self.pumps:
+        if not self._valid_id(pump_id):
             return False
+        queue = self._queues[pump_id - 1]
         
-        # Check queue depth
-        if len(self.command_queues[pump_id]) >= max_queue:
-            if self.debug:
+        # Check queue depth (never exceed the deque capacity, which would drop the oldest)
+        queue_len = len(queue)
+        if queue_len >= max_queue or queue_len >= self.max_queue:
+            if _DEBUG:
                 print(f"[PumpBank] Queue full for pump {pump_id}")
             return False
         
         # Validate parameters with early rejection of no-ops
-        duty_percent = max(0, min(100, duty_percent))
-        duration_sec = max(0, min(3600, duration_sec))  # Max 1 hour
+        duty_percent = 0 if duty_percent < 0 else (100 if duty_percent > 100 else duty_percent)
+        duration_sec = 0 if duration_sec < 0 else (3600 if duration_sec > 3600 else duration_sec)  # Max 1 hour
         
         # Reject no-op commands to avoid wasting queue slots
         if duty_percent == 0 or duration_sec == 0:
-            if self.debug:
+            if _DEBUG:
                 print(f"[PumpBank] Rejected no-op command for pump {pump_id}")
             return False
         
+        now = utime.ticks_ms()
         command = {
             "duty": duty_percent,
             "duration": duration_sec,
-            "command_id": command_id or f"cmd_{utime.ticks_ms()}",
-            "queued_time": utime.ticks_ms()
+            "command_id": command_id if command_id is not None else now,  # int id when none given
+            "queued_time": now
         }
         
-        self.command_queues[pump_id].append(command)
-        if self.debug:
+        queue.append(command)
+        self._dispatch_pending = True
+        if _DEBUG:
             print(f"[PumpBank] Queued pump {pump_id}: {duty_percent}% for {duration_sec}s")
         return True
     
     def flush_queue(self, pump_id):
         """Flush command queue for specific pump to prevent stale commands."""
-        if pump_id in self.command_queues:
-            cleared_count = len(self.command_queues[pump_id])
-            self.command_queues[pump_id].clear()
+        if self._valid_id(pump_id):
+            queue = self._queues[pump_id - 1]
+            cleared_count = len(queue)
+            # MicroPython's deque has no clear(); drain in place so the
+            # update_all() pairs keep pointing at the live queue
+            while queue:
+                queue.popleft()
             if self.debug and cleared_count > 0:
                 print(f"[PumpBank] Flushed {cleared_count} commands from pump {pump_id} queue")
             return cleared_count
@@ -288,58 +437,125 @@ class PumpBank:
     def flush_all_queues(self):
         """Flush all command queues."""
         total_cleared = 0
-        for pump_id in self.command_queues:
+        for pump_id in range(1, self._n_pumps + 1):
             total_cleared += self.flush_queue(pump_id)
         return total_cleared
     
     def update_all(self):
         """Update all pumps and process queued commands."""
-        for pump_id, pump in self.pumps.items():
-            # Update running pump
-            pump.update()
+        now = utime.ticks_ms()  # One timestamp for the whole bank
+        
+        # Nothing to dispatch and no run has expired yet: skip the per-pump pass
+        min_deadline = self._min_deadline
+        if not self._dispatch_pending and (min_deadline is None or utime.ticks_diff(now, min_deadline) < 0):
+            return
+        
+        deadlines = self._deadlines
+        running = self._running
+        if self._dispatch_pending:
+            # A direct start() may have moved a deadline since the last pass;
+            # judge expiry on the live values, not the cached ones
+            i = 0
+            for pump in self._pumps:
+                deadlines[i] = pump.deadline_ms
+                running[i] = 1 if pump.is_running else 0
+                i += 1
+        expired = _find_expired(now, deadlines, running, self._n_pumps)
+        
+        min_deadline = None
+        i = 0
+        for pump, queue in self._pump_queue_pairs:
+            # Stop runs the kernel flagged as expired
+            if expired & (1 << i):
+                pump.stop()
             
             # Start next queued command if pump is idle
-            if not pump.is_running and self.command_queues[pump_id]:
-                command = self.command_queues[pump_id].pop(0)  # FIFO
-                pump.start(command["duty"], command["duration"])
+            if not pump.is_running and queue:
+                command = queue.popleft()  # FIFO
+                pump._start_unchecked(command["duty"], command["duration"])  # Validated at queue time
+            
+            if pump.is_running:
+                deadline = pump.deadline_ms
+                deadlines[i] = deadline
+                running[i] = 1
+                # Track the nearest expiry (ticks_diff keeps this wraparound-safe)
+                if min_deadline is None or utime.ticks_diff(deadline, min_deadline) < 0:
+                    min_deadline = deadline
+            else:
+                running[i] = 0
+            i += 1
+        
+        self._min_deadline = min_deadline
+        self._dispatch_pending = False
     
     def emergency_stop_all(self):
         """Emergency stop all pumps with PWM deinit."""
-        for pump in self.pumps.values():
+        for pump in self._pumps:
             pump.emergency_stop()
         
         # Clear all queues
         total_cleared = self.flush_all_queues()
+        for i in range(self._n_pumps):
+            self._running[i] = 0
+        self._min_deadline = None
+        self._dispatch_pending = False
         
         print(f"[PumpBank] EMERGENCY STOP - All pumps stopped, {total_cleared} commands cleared")
     
     def get_all_status(self):
-        """Get status of all pumps."""
+        """Get status of all pumps, keyed by pump_id."""
         status = {}
-        for pump_id, pump in self.pumps.items():
-            status[pump_id] = pump.get_status()
-            status[pump_id]["queue_length"] = len(self.command_queues[pump_id])
+        for pump, queue in self._pump_queue_pairs:
+            status[pump.pump_id] = pump._build_status(len(queue))
         
         return status
     
+    def get_status_arrays(self):
+        """Refresh and return (duty, total_volume, queue_len, running_mask).
+        
+        The arrays are the bank's own buffers, returned by reference.
+        """
+        duty = self.duty
+        total_volume = self.total_volume
+        queue_len = self.queue_len
+        mask = 0
+        i = 0
+        for pump, queue in self._pump_queue_pairs:
+            duty[i] = pump.current_duty
+            total_volume[i] = pump.total_volume_ml
+            queue_len[i] = len(queue)
+            if pump.is_running:
+                mask |= 1 << i
+            i += 1
+        self.running_mask = mask
+        return duty, total_volume, queue_len, mask
+    
     def update_calibration(self, calibrations):
         """Update calibration for multiple pumps."""
+        stalled = []
         for pump_id, calib in calibrations.items():
-            if pump_id in self.pumps and "a" in calib and "b" in calib:
-                self.pumps[pump_id].set_calibration(calib["a"], calib["b"])
+            if self._valid_id(pump_id) and "a" in calib and "b" in calib:
+                pump = self._pumps[pump_id - 1]
+                pump.set_calibration(calib["a"], calib["b"], warn=False)
+                if pump.calib_a == 0.0:
+                    stalled.append(pump_id)
+        
+        # One console line for the whole batch (serial output is synchronous)
+        if stalled:
+            _warn_if_stalled(stalled)
     
     def reset_volumes(self, pump_ids=None):
         """Reset volume counters for specified pumps (or all if None)."""
-        pump_ids = pump_ids or list(self.pumps.keys())
+        pump_ids = pump_ids or range(1, self._n_pumps + 1)
         
         for pump_id in pump_ids:
-            if pump_id in self.pumps:
-                self.pumps[pump_id].reset_volume()
+            if self._valid_id(pump_id):
+                self._pumps[pump_id - 1].reset_volume()
     
     def set_debug(self, debug):
         """Enable/disable debug output for all pumps."""
         self.debug = debug
-        for pump in self.pumps.values():
+        for pump in self._pumps:
             pump.debug = debug
 
 
@@ -2,16 +2,20 @@
 import gc
 import esp
 import network
+import netinfo
 
 # ESP32 boot optimizations
 esp.osdebug(None)  # Turn off vendor OS debug messages
 gc.collect()       # Clean up memory
+# Collect proactively once a quarter of the free heap is used, rather than
+# waiting for an allocation failure in the middle of a PWM update
+gc.threshold(gc.mem_free() // 4 + gc.mem_alloc())
 
-# Configure network in station mode
+# Station interface only; the radio is activated by connect_wifi() after the
+# pump bank is initialised, so the WiFi driver does not compete with pump init
 wlan = network.WLAN(network.STA_IF)
-wlan.active(True)
 
 print('=== MCMC ESP-C Boot Sequence ===')
 print('Memory free:', gc.mem_free())
-print('WiFi MAC:', ':'.join(['%02x' % b for b in wlan.config('mac')]))
+print('WiFi MAC:', netinfo.MAC_HEX)
 print('Boot sequence complete - starting main.py') 
\ No newline at end of file
@@ -5,18 +5,65 @@
 # Pump 2 (Signal): Upon command only at specified %
 
 from machine import Pin, PWM, Timer
+from array import array
 import time
 import os
+try:
+    from bisect import bisect_left
+except ImportError:
+    # MicroPython has no bisect module
+    def bisect_left(a, x):
+        lo, hi = 0, len(a)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if a[mid] < x:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+try:
+    import micropython
+    from micropython import const
+    micropython.alloc_emergency_exception_buf(128)  # Tracebacks from timer callbacks
+except ImportError:
+    # CPython (host tools): no compile-time constants, and identity stand-ins
+    # for the @micropython.native/viper compiler directives
+    class micropython:
+        @staticmethod
+        def native(func):
+            return func
+        viper = native
+    def const(value):
+        return value
+
+@micropython.viper
+def _clamp(d: int, maxd: int) -> int:
+    return 0 if d < 0 else (maxd if d > maxd else d)
+
+def _u16_setter(pwm):
+    """Return a callable that sets pwm duty from a 16-bit value on any build."""
+    if hasattr(pwm, "duty_u16"):
+        return pwm.duty_u16
+    return lambda v, p=pwm: p.duty(v >> 6)  # 10-bit duty() builds
+
+# ChemostatController._work_pending bits: what the event timer has to service
+_WORK_PULSE = const(1)         # At least one pump is pulsing
+_WORK_SIGNAL_PAUSE = const(2)  # A signal-pause sequence is running
+_WORK_LOG = const(4)           # Buffered log lines are waiting for their flush deadline
+
+# Pump id for a single set mask bit: _BIT_PUMP[1 << pid] == pid (pids 1-4).
+# MicroPython ints have no bit_length(), so the lowest set bit is looked up here.
+_BIT_PUMP = bytes([0, 0, 1, 0, 2, 0, 0, 0, 3, 0, 0, 0, 0, 0, 0, 0, 4])
 
 # Configuration
 PUMP_PINS = [32, 33, 25, 26]  # GPIO pins for pumps 1-4
 LED_PIN = 27                  # LED pin
 STATUS_LED_PIN = 2            # Built-in status LED
-PWM_FREQUENCY = 20000         # 20kHz PWM frequency (from calibration system)
+PWM_FREQUENCY = const(20000)  # 20kHz PWM frequency (from calibration system)
 
 # Flow control parameters
-OVERFLOW_MULTIPLIER = 3       # Pump 4 runs 3X longer than pumps 1&3
-DEFAULT_SIGNAL_TIME = 5       # Default signal injection time
+OVERFLOW_MULTIPLIER = const(3)  # Pump 4 runs 3X longer than pumps 1&3
+DEFAULT_SIGNAL_TIME = const(5)  # Default signal injection time
 
 # PWM profiles for different supply voltages
 PUMP_PROFILES = {
@@ -27,10 +74,19 @@ PUMP_PROFILES = {
 # Default supply voltage (can be changed)
 SUPPLY_VOLTAGE = 12
 
+# Log file write buffering
+LOG_BUFFER_SIZE = const(4096)        # Bytes held in RAM before a write
+LOG_FLUSH_INTERVAL_MS = const(1000)  # Max age of buffered lines
+
 class Logger:
     def __init__(self):
         self.log_file = None
-        self.start_time = 0
+        self.start_time = None  # ticks_ms when logging started
+        self._buf = bytearray(LOG_BUFFER_SIZE)
+        self._buf_len = 0
+        self._last_flush = time.ticks_ms()
+        self._first_ms = 0        # ticks_ms of the oldest buffered line
+        self.on_buffered = None   # Called when a line lands in an empty buffer
 
     def start_logging(self, filename):
         if self.log_file:
@@ -42,8 +98,10 @@ class Logger:
                 timestamp = time.localtime()
                 filename = f"chemostat_log_{timestamp[0]:04d}{timestamp[1]:02d}{timestamp[2]:02d}_{timestamp[3]:02d}{timestamp[4]:02d}.log"
             
-            self.log_file = open(filename, 'w')
-            self.start_time = time.time()
+            self.log_file = open(filename, 'wb')
+            self._buf_len = 0
+            self._last_flush = time.ticks_ms()
+            self.start_time = time.ticks_ms()
             self.log(f"Log started: {filename}")
             return True
         except Exception as e:
@@ -54,46 +112,124 @@ class Logger:
     def stop_logging(self):
         if self.log_file:
             self.log("Log stopped.")
+            self.flush()
             self.log_file.close()
             self.log_file = None
-            self.start_time = 0
+            self.start_time = None
 
     def log(self, message):
-        elapsed_seconds = 0
-        if self.start_time > 0:
-            elapsed_seconds = time.time() - self.start_time
-        
-        formatted_message = f"[{elapsed_seconds:.2f}s] {message}"
-        print(formatted_message)
+        # Integer seconds/centiseconds, so no float is boxed per line
+        now = time.ticks_ms()
+        elapsed_ms = time.ticks_diff(now, self.start_time) if self.start_time is not None else 0
+        sec = elapsed_ms // 1000
+        cs = (elapsed_ms % 1000) // 10
+        print("[%d.%02ds]" % (sec, cs), message)
         
         if self.log_file:
-            self.log_file.write(formatted_message + '\n')
+            # Assemble the line directly in the preallocated buffer: header, text, newline
+            header = b"[%d.%02ds] " % (sec, cs)
+            body = message.encode()
+            h = len(header)
+            n = h + len(body) + 1
+            if self._buf_len + n > LOG_BUFFER_SIZE or time.ticks_diff(now, self._last_flush) > LOG_FLUSH_INTERVAL_MS:
+                self.flush()
+            if n > LOG_BUFFER_SIZE:
+                # Oversized line: write straight through
+                self.log_file.write(header)
+                self.log_file.write(body)
+                self.log_file.write(b'\n')
+            else:
+                buf = self._buf
+                pos = self._buf_len
+                buf[pos:pos + h] = header
+                buf[pos + h:pos + n - 1] = body
+                buf[pos + n - 1] = 10  # '\n'
+                self._buf_len = pos + n
+                if not pos:
+                    # Start of a new batch: whoever drives tick() has to wake up for it
+                    self._first_ms = now
+                    if self.on_buffered is not None:
+                        self.on_buffered()
+
+    def due_in(self, now):
+        """ms until the buffered lines must be written, or None if nothing is buffered."""
+        if not self._buf_len:
+            return None
+        return LOG_FLUSH_INTERVAL_MS - time.ticks_diff(now, self._first_ms)
+
+    def tick(self, now):
+        """Flush once the oldest buffered line is LOG_FLUSH_INTERVAL_MS old, even if logging went quiet."""
+        d = self.due_in(now)
+        if d is not None and d <= 0:
+            self.flush()
+
+    def flush(self):
+        """Write buffered log lines to the file."""
+        if self.log_file and self._buf_len:
+            self.log_file.write(memoryview(self._buf)[:self._buf_len])
             self.log_file.flush()
+        self._buf_len = 0
+        self._last_flush = time.ticks_ms()
 
 class PumpCalibration:
     def __init__(self, file_path, logger):
         self.file_path = file_path
         self.logger = logger
         self.calibration_data = []
+        # Fixed-point interpolation tables built by load_calibration():
+        # duties[i], flow_q10[i] = flow * 1024 and slope_q16[i] = d(duty)/d(flow) * 65536
+        # between points i and i+1 (a list, as steep segments overflow 32 bits)
+        self.duties = array('i')
+        self.flow_q10 = array('i')
+        self.slope_q16 = []
+        self._min_duty, self._min_flow = 0, 0
         self.load_calibration()
 
     def load_calibration(self):
         try:
+            data = self.calibration_data
             with open(self.file_path, 'r') as f:
-                lines = f.readlines()
-                # Skip header
-                for line in lines[1:]:
-                    parts = line.strip().split(',')
-                    if len(parts) == 4:
-                        duty, _, _, flow_gps = map(float, parts)
-                        # Convert flow from g/s to g/min
-                        self.calibration_data.append((duty, flow_gps * 60))
-            # Sort by duty
-            self.calibration_data.sort(key=lambda x: x[0])
+                f.readline()  # Skip header
+                # Stream rows, inserting each in duty order (no line list, no sort pass)
+                for line in f:
+                    parts = line.split(',')
+                    if len(parts) != 4:
+                        continue
+                    try:
+                        duty = float(parts[0])
+                        flow_gpm = float(parts[3]) * 60  # Convert flow from g/s to g/min
+                    except ValueError:
+                        continue
+                    point = (duty, flow_gpm)
+                    data.insert(bisect_left(data, point), point)
+            self._build_tables()
             self.logger.log(f"✅ Loaded {len(self.calibration_data)} calibration points from {self.file_path}")
         except Exception as e:
             self.logger.log(f"❌ Could not load calibration file {self.file_path}: {e}")
 
+    def _build_tables(self):
+        """Precompute the lookup arrays used by get_duty_for_flow().
+        
+        Assumes flow rises with duty, which holds for the peristaltic pumps.
+        """
+        data = self.calibration_data
+        self.duties = array('i', [int(d) for d, _ in data])
+        self.flow_q10 = array('i', [int(f * 1024) for _, f in data])
+        self.slope_q16 = [
+            int((data[i + 1][0] - data[i][0]) * 65536 / (data[i + 1][1] - data[i][1]))
+            if data[i + 1][1] != data[i][1] else 0
+            for i in range(len(data) - 1)
+        ]
+        self._min_duty, self._min_flow = self._compute_min_flow()
+
+    def _compute_min_flow(self):
+        """Scan once for the lowest duty and flow rate that is not zero."""
+        for duty, flow_gpm in self.calibration_data:
+            if flow_gpm > 0:
+                return int(duty), flow_gpm
+        return 0, 0
+
+    @micropython.native
     def get_duty_for_flow(self, target_flow_gpm):
         if not self.calibration_data:
             self.logger.log("❌ No calibration data available.")
@@ -102,28 +238,24 @@ class PumpCalibration:
         if target_flow_gpm <= 0:
             return 0
         
-        min_duty, min_flow = self.get_min_flow()
-        if target_flow_gpm < min_flow:
-            return int(min_duty)
-
-        # Find two points to interpolate between
-        for i in range(len(self.calibration_data) - 1):
-            (d1, f1) = self.calibration_data[i]
-            (d2, f2) = self.calibration_data[i+1]
-            if f1 <= target_flow_gpm <= f2:
-                if f2 == f1: return int(d1)
-                duty = d1 + (d2 - d1) * (target_flow_gpm - f1) / (f2 - f1)
-                return int(duty)
-        
-        self.logger.log(f"⚠️ Target flow {target_flow_gpm}gpm is above calibrated max, using max duty.")
-        return int(self.calibration_data[-1][0])
+        if target_flow_gpm < self._min_flow:
+            return self._min_duty
+
+        # Binary search for the segment flows[i-1] < target <= flows[i], all in Q10
+        flow_q10 = self.flow_q10
+        target_q10 = int(target_flow_gpm * 1024)
+        i = bisect_left(flow_q10, target_q10)
+        if i == 0:
+            return self.duties[0]
+        if i >= len(flow_q10):
+            self.logger.log(f"⚠️ Target flow {target_flow_gpm}gpm is above calibrated max, using max duty.")
+            return self.duties[-1]
+        # Q16 slope * Q10 flow offset = Q26 duty offset, rounded to the nearest count
+        return self.duties[i - 1] + ((self.slope_q16[i - 1] * (target_q10 - flow_q10[i - 1]) + (1 << 25)) >> 26)
 
     def get_min_flow(self):
         """Returns the lowest duty and flow rate that is not zero."""
-        for duty, flow_gpm in self.calibration_data:
-            if flow_gpm > 0:
-                return int(duty), flow_gpm
-        return 0, 0
+        return self._min_duty, self._min_flow
 
 class ChemostatController:
     def __init__(self):
@@ -133,40 +265,43 @@ class ChemostatController:
         # Get pump profile for current supply voltage
         self.pump_profile = PUMP_PROFILES[SUPPLY_VOLTAGE]
         self.max_duty = self.pump_profile['max_duty']
-        
-        # Initialize pumps with variable PWM control
-        self.pumps = {}
-        self.pump_names = {1: "Media", 2: "Signal", 3: "Chamber", 4: "Overflow"}
-        self.calibrations = {}
-
-        # Load calibration data
+        self._freq = self.pump_profile['freq']
+        
+        # Initialize pumps with variable PWM control.
+        # Per-pump state is held in lists/arrays indexed by pump_id (slot 0 unused).
+        self.pumps = [None] * 5
+        self.pump_names = (None, "Media", "Signal", "Chamber", "Overflow")
+        self._pump_prefix = (None,) + tuple(name + " Pump: " for name in self.pump_names[1:])
+        self.log_level = 1  # 2 = also log routine per-transition messages
+        self.calibrations = [None] * 5
+
+        # Load calibration data (one directory scan for all pumps)
+        files = set(os.listdir())
+        missing = []
         for i in range(1, 5):
             cal_file = f"pump{i}_{SUPPLY_VOLTAGE}V_calib.csv"
-            if cal_file in os.listdir():
+            if cal_file in files:
                 self.calibrations[i] = PumpCalibration(cal_file, self.logger)
             else:
-                self.logger.log(f"⚠️ Calibration file not found for pump {i}: {cal_file}")
                 self.calibrations[i] = None
+                missing.append(i)
+        if missing:
+            self.logger.log(f"⚠️ Calibration file not found for pump(s) {missing} (pump<N>_{SUPPLY_VOLTAGE}V_calib.csv)")
 
+        # 16-bit duty setters indexed by pump_id (slot 0 unused, None if init failed),
+        # resolved once so _set_pump_pwm_duty() skips the dict lookup and hasattr
+        self._setters = [None] * (len(PUMP_PINS) + 1)
+        
         # Ensure ALL pumps start from OFF before any action
         self.logger.log("🔄 Initializing pumps to OFF state...")
         for i, pin_num in enumerate(PUMP_PINS):
             pump_id = i + 1
             try:
-                # Create a Pin object
-                pin = Pin(pin_num, Pin.OUT)
-                
-                # Create PWM object, ensuring it starts with 0 duty
-                pwm = PWM(pin, freq=self.pump_profile['freq'], duty=0)
-                
-                # For absolute certainty, set duty to 0 again.
-                # This handles various MicroPython builds.
-                if hasattr(pwm, "duty_u16"):
-                    pwm.duty_u16(0)
-                else:
-                    pwm.duty(0)
+                # Create PWM object starting at 0 duty (PWM configures the pad as output)
+                pwm = PWM(Pin(pin_num), freq=self._freq, duty=0)
                 
                 self.pumps[pump_id] = pwm
+                self._setters[pump_id] = _u16_setter(pwm)
                 self.logger.log(f"✅ Pump {pump_id} ({self.pump_names[pump_id]}) on GPIO {pin_num} - Initialized OFF")
             except Exception as e:
                 self.logger.log(f"❌ Failed to init Pump {pump_id}: {e}")
@@ -174,11 +309,8 @@ class ChemostatController:
         # Initialize LED and status
         try:
             # Initialize PWM with duty=0 in the constructor
-            self.led = PWM(Pin(LED_PIN, Pin.OUT), freq=self.pump_profile['freq'], duty=0)
-            if hasattr(self.led, "duty_u16"):
-                self.led.duty_u16(0)
-            else:
-                self.led.duty(0)
+            self.led = PWM(Pin(LED_PIN), freq=self._freq, duty=0)
+            self._led_setter = _u16_setter(self.led)
             
             self.status_led = Pin(STATUS_LED_PIN, Pin.OUT)
             self.status_led.off()
@@ -186,6 +318,7 @@ class ChemostatController:
         except Exception as e:
             self.logger.log(f"❌ LED init failed: {e}")
             self.led = None
+            self._led_setter = None
             self.status_led = None
         
         # Control state
@@ -195,114 +328,184 @@ class ChemostatController:
         self.signal_active = False
         
         # Current pump duty levels (0-100%) and flow rates (g/min)
-        self.pump_duties = {1: 0, 2: 0, 3: 0, 4: 0}
-        self.pump_flow_rates = {1: 0, 2: 0, 3: 0, 4: 0}
+        self.pump_duties = array('f', [0.0] * 5)
+        self.pump_flow_rates = array('f', [0.0] * 5)
         
         # Timers for automatic pump control
         self.timer1 = Timer(1)
         self.timer2 = Timer(2)
-        
-        # Timer for low-flow pulsing
-        self.pulsing_pumps = {}
+        self.signal_timer = Timer(0)  # Reused for every signal injection
+        
+        # Timer callbacks bound once, so arming a timer never allocates a bound method
+        self._cb_stop_media_chamber = self._stop_media_chamber
+        self._cb_stop_overflow = self._stop_overflow_and_finish
+        self._cb_stop_signal = self._stop_signal
+        
+        # Low-flow pulsing: bit pump_id of _pulse_mask is set while that pump pulses
+        self._pulse_mask = 0
+        self.pulse_on_ms = array('i', [0] * 5)
+        self.pulse_off_ms = array('i', [0] * 5)
+        self.pulse_duty = array('i', [0] * 5)
+        self._pulse_state_mask = 0  # Bit pump_id set while that pump is in its on phase
+        self.pulse_next_change = array('i', [0] * 5)  # ticks_ms
         self.signal_pause_state = {'active': False}
-        self.control_timer = Timer(3)
-        self.control_timer.init(period=250, mode=Timer.PERIODIC, callback=self._main_control_loop)
+        self._work_pending = 0  # _WORK_* bits
+        
+        # One-shot timer for low-flow pulsing and signal-pause phases, armed for
+        # the next pending transition only (no periodic polling when idle)
+        try:
+            self.event_timer = Timer(-1)  # Soft timer where the port has them; keeps Timer(3) free
+        except ValueError:
+            self.event_timer = Timer(3)   # ESP32: hardware timers only
+        self._event_cb = self._on_event  # Bound once; re-arming doesn't allocate a new method
+        self.logger.on_buffered = self._on_log_buffered  # Timed flush rides the event timer
         
         self.logger.log("🎮 Chemostat Controller Ready!")
         self.logger.log(f"⚡ Pumps operate at 0-100% duty ({SUPPLY_VOLTAGE}V profile)")
-        self.logger.log(f"📊 PWM: {self.pump_profile['freq']}Hz, Max duty: {self.max_duty}")
+        self.logger.log(f"📊 PWM: {self._freq}Hz, Max duty: {self.max_duty}")
     
     def _set_pump_pwm_duty(self, pump_id, duty_13bit):
         """Internal method to set raw 13-bit PWM duty."""
-        if pump_id not in self.pumps: return False
-        try:
-            duty_13bit = max(0, min(duty_13bit, self.max_duty))
-            if hasattr(self.pumps[pump_id], "duty_u16"):
-                self.pumps[pump_id].duty_u16(duty_13bit * 8)
-            else:
-                self.pumps[pump_id].duty(duty_13bit >> 3)
-            self.pump_duties[pump_id] = (duty_13bit / self.max_duty) * 100
-            return True
-        except Exception as e:
-            self.logger.log(f"❌ Error setting duty for Pump {pump_id}: {e}")
-            return False
+        if not 0 < pump_id < len(self._setters): return False
+        setter = self._setters[pump_id]
+        if setter is None: return False
+        d = _clamp(duty_13bit, self.max_duty)
+        setter(d * 8)
+        self.pump_duties[pump_id] = (d * 100) // self.max_duty
+        return True
 
     def set_pump_flow_rate(self, pump_id, flow_gpm):
         """Set pump to a specified flow rate in g/min, using pulsing for low flow."""
         self.pump_flow_rates[pump_id] = flow_gpm
         
         # Stop pulsing if it's active for this pump
-        if pump_id in self.pulsing_pumps:
-            del self.pulsing_pumps[pump_id]
+        self._pulse_mask &= ~(1 << pump_id)
+        if not self._pulse_mask:
+            self._work_pending &= ~_WORK_PULSE
 
         if flow_gpm <= 0:
             self._set_pump_pwm_duty(pump_id, 0)
-            self.logger.log(f"🔧 {self.pump_names[pump_id]} Pump: OFF")
+            self.logger.log(self._pump_prefix[pump_id] + "OFF")
             return
 
-        cal = self.calibrations.get(pump_id)
+        cal = self.calibrations[pump_id]
         if not cal:
-            self.logger.log(f"⚠️ No calibration for pump {pump_id}. Interpreting flow as duty %.")
+            # No calibration: interpret flow as duty %
             duty_13bit = int((flow_gpm / 100.0) * self.max_duty)
             self._set_pump_pwm_duty(pump_id, duty_13bit)
+            self.logger.log("%s%.1f%% duty (no calibration)" % (self._pump_prefix[pump_id], flow_gpm))
             return
 
         min_duty, min_flow = cal.get_min_flow()
 
         if 0 < flow_gpm < min_flow:
-            on_time = (flow_gpm / min_flow) * 60.0
-            off_time = 60.0 - on_time
-            self.pulsing_pumps[pump_id] = {
-                'on_time': on_time, 'off_time': off_time, 'duty': min_duty,
-                'state': 'off', 'next_change': time.time()
-            }
-            self.logger.log(f"🔧 {self.pump_names[pump_id]} Pump: Pulsing for {flow_gpm:.2f} g/min (on {on_time:.1f}s, off {off_time:.1f}s)")
+            on_ms = int((flow_gpm / min_flow) * 60000)
+            off_ms = 60000 - on_ms
+            self.pulse_on_ms[pump_id] = on_ms
+            self.pulse_off_ms[pump_id] = off_ms
+            self.pulse_duty[pump_id] = min_duty
+            self._pulse_state_mask &= ~(1 << pump_id)
+            self.pulse_next_change[pump_id] = time.ticks_ms()
+            self._pulse_mask |= 1 << pump_id
+            self._work_pending |= _WORK_PULSE
+            self.logger.log("%sPulsing for %.2f g/min (on %.1fs, off %.1fs)" % (self._pump_prefix[pump_id], flow_gpm, on_ms / 1000, off_ms / 1000))
+            self._schedule_next_event()
         else:
             duty = cal.get_duty_for_flow(flow_gpm)
             self._set_pump_pwm_duty(pump_id, duty)
             duty_percent = (duty / self.max_duty) * 100
-            self.logger.log(f"🔧 {self.pump_names[pump_id]} Pump: {flow_gpm:.2f} g/min ({duty_percent:.1f}% duty)")
-
-    def _main_control_loop(self, timer):
-        now = time.time()
-        self._update_pulsing_pumps(now)
-        self._update_signal_pause(now)
+            self.logger.log("%s%.2f g/min (%.1f%% duty)" % (self._pump_prefix[pump_id], flow_gpm, duty_percent))
+
+    def _on_event(self, timer):
+        """One-shot timer callback: run due transitions, then re-arm for the next one."""
+        work = self._work_pending
+        if not work:
+            return  # Stale wake-up: everything was stopped since the timer was armed
+        now = time.ticks_ms()
+        if work & _WORK_PULSE:
+            self._update_pulsing_pumps(now)
+        if work & _WORK_SIGNAL_PAUSE:
+            self._update_signal_pause(now)
+        if work & _WORK_LOG:
+            self.logger.tick(now)
+            if self.logger.due_in(now) is None:
+                self._work_pending &= ~_WORK_LOG
+        self._schedule_next_event()
+
+    def _on_log_buffered(self):
+        """Logger hook: make sure the event timer wakes up for the next log flush."""
+        self._work_pending |= _WORK_LOG
+        self._schedule_next_event()
+
+    def _schedule_next_event(self):
+        """Arm the event timer for the earliest pending pulse, signal-pause transition or log flush."""
+        now = time.ticks_ms()
+        delay = None
+        m = self._pulse_mask
+        while m:
+            pid = _BIT_PUMP[m & -m]
+            m &= m - 1
+            d = time.ticks_diff(self.pulse_next_change[pid], now)
+            if delay is None or d < delay:
+                delay = d
+        if self._work_pending & _WORK_LOG:
+            d = self.logger.due_in(now)
+            if d is None:
+                self._work_pending &= ~_WORK_LOG  # Flushed by a full buffer or stop_logging()
+            elif delay is None or d < delay:
+                delay = d
+        if self._work_pending & _WORK_SIGNAL_PAUSE:
+            d = time.ticks_diff(self.signal_pause_state['end_time'], now)
+            if delay is None or d < delay:
+                delay = d
+        
+        if delay is None:
+            self.event_timer.deinit()  # Nothing pending
+        else:
+            self.event_timer.init(period=max(1, delay), mode=Timer.ONE_SHOT, callback=self._event_cb)
 
+    @micropython.native
     def _update_pulsing_pumps(self, now):
-        for pump_id, pulse_data in self.pulsing_pumps.items():
-            if now >= pulse_data['next_change']:
-                if pulse_data['state'] == 'on':
-                    self._set_pump_pwm_duty(pump_id, 0)
-                    pulse_data['state'] = 'off'
-                    pulse_data['next_change'] = now + pulse_data['off_time']
-                else: # state is 'off'
-                    self._set_pump_pwm_duty(pump_id, pulse_data['duty'])
-                    pulse_data['state'] = 'on'
-                    pulse_data['next_change'] = now + pulse_data['on_time']
+        next_change = self.pulse_next_change
+        m = self._pulse_mask
+        while m:
+            bit = m & -m  # Lowest active pump
+            m &= m - 1
+            pid = _BIT_PUMP[bit]
+            if time.ticks_diff(now, next_change[pid]) >= 0:
+                self._pulse_state_mask ^= bit
+                if not self._pulse_state_mask & bit:  # Toggled into the off phase
+                    self._set_pump_pwm_duty(pid, 0)
+                    next_change[pid] = time.ticks_add(now, self.pulse_off_ms[pid])
+                    if self.log_level >= 2:
+                        self.logger.log(self._pump_prefix[pid] + "pulse OFF")
+                else:  # Toggled into the on phase
+                    self._set_pump_pwm_duty(pid, self.pulse_duty[pid])
+                    next_change[pid] = time.ticks_add(now, self.pulse_on_ms[pid])
+                    if self.log_level >= 2:
+                        self.logger.log(self._pump_prefix[pid] + "pulse ON")
     
     def _update_signal_pause(self, now):
-        if not self.signal_pause_state.get('active'):
-            return
-
         state = self.signal_pause_state
-        if now >= state['end_time']:
+        if time.ticks_diff(now, state['end_time']) >= 0:
             phase = state['phase']
             if phase == 'inject':
                 self.logger.log("⏱️  Signal Pause: Mix phase")
                 self.set_pump_flow_rate(2, 0)
                 state['phase'] = 'mix'
-                state['end_time'] = now + state['mix_duration']
+                state['end_time'] = time.ticks_add(now, int(state['mix_duration'] * 1000))
             elif phase == 'mix':
                 self.logger.log("⏱️  Signal Pause: Pause phase")
                 self.set_pump_flow_rate(1, 0)
                 self.set_pump_flow_rate(3, 0)
                 state['phase'] = 'pause'
-                state['end_time'] = now + state['pause_duration']
+                state['end_time'] = time.ticks_add(now, int(state['pause_duration'] * 1000))
             elif phase == 'pause':
                 self.logger.log("⏱️  Signal Pause: Resuming normal operation")
                 self.set_pump_flow_rate(1, state['original_flows'][1])
                 self.set_pump_flow_rate(3, state['original_flows'][3])
                 state['active'] = False
+                self._work_pending &= ~_WORK_SIGNAL_PAUSE
     
     def chemostat_cycle(self, T_seconds, media_flow, chamber_flow, overflow_flow, log_filename=None):
         """Run one chemostat cycle using timers with flow rate control."""
@@ -329,11 +532,11 @@ class ChemostatController:
         
         # Set timer to stop pumps 1&3 after T seconds
         self.timer1.init(period=T_seconds * 1000, mode=Timer.ONE_SHOT, 
-                         callback=self._stop_media_chamber)
+                         callback=self._cb_stop_media_chamber)
         
         # Set timer to stop pump 4 after 3T seconds
         self.timer2.init(period=T_seconds * OVERFLOW_MULTIPLIER * 1000, mode=Timer.ONE_SHOT,
-                         callback=self._stop_overflow_and_finish)
+                         callback=self._cb_stop_overflow)
         
         self.logger.log("✅ Chemostat cycle started!")
         self.logger.log("💡 You can now send signal() commands!")
@@ -389,7 +592,7 @@ class ChemostatController:
         """Inject signal material with flow rate control."""
         duration_sec = duration_sec or DEFAULT_SIGNAL_TIME
         
-        if self.signal_active or self.signal_pause_state.get('active'):
+        if self.signal_active or self._work_pending & _WORK_SIGNAL_PAUSE:
             self.logger.log("💉 Signal or sequence already active - please wait")
             return
         
@@ -400,20 +603,19 @@ class ChemostatController:
         self.set_pump_flow_rate(2, signal_flow)
         
         # Set timer to stop signal pump
-        signal_timer = Timer(0)  # Use timer 0 for signals
-        signal_timer.init(period=duration_sec * 1000, mode=Timer.ONE_SHOT,
-                         callback=lambda t: self._stop_signal(signal_timer))
+        self.signal_timer.init(period=duration_sec * 1000, mode=Timer.ONE_SHOT,
+                               callback=self._cb_stop_signal)
     
     def _stop_signal(self, timer):
         """Timer callback to stop signal pump"""
         self.set_pump_flow_rate(2, 0)
         self.signal_active = False
-        timer.deinit()
+        self.signal_timer.deinit()
         self.logger.log("✅ Signal injection complete")
     
     def signal_pause(self, time_s, amount_gpm, mixing_time_s, pause_s):
         """Run the full inject-mix-pause sequence."""
-        if self.signal_active or self.signal_pause_state.get('active'):
+        if self.signal_active or self._work_pending & _WORK_SIGNAL_PAUSE:
             self.logger.log("💉 Signal or sequence already active - please wait")
             return
 
@@ -425,15 +627,17 @@ class ChemostatController:
         self.signal_pause_state = {
             'active': True,
             'phase': 'inject',
-            'end_time': time.time() + time_s,
+            'end_time': time.ticks_add(time.ticks_ms(), int(time_s * 1000)),
             'mix_duration': mixing_time_s,
             'pause_duration': pause_s,
             'original_flows': {
-                1: self.pump_flow_rates.get(1, 0),
-                3: self.pump_flow_rates.get(3, 0)
+                1: self.pump_flow_rates[1],
+                3: self.pump_flow_rates[3]
             }
         }
+        self._work_pending |= _WORK_SIGNAL_PAUSE
         self.set_pump_flow_rate(2, amount_gpm)
+        self._schedule_next_event()
 
     def stop_chemostat(self):
         """Stop current chemostat cycle or continuous run."""
@@ -452,11 +656,13 @@ class ChemostatController:
         
         # Reset any active sequences
         self.signal_pause_state = {'active': False}
+        self._work_pending &= ~_WORK_SIGNAL_PAUSE
         
         # Stop pumps 1, 3, 4 (leave signal pump alone)
         self.set_pump_flow_rate(1, 0)
         self.set_pump_flow_rate(3, 0)
         self.set_pump_flow_rate(4, 0)
+        self._schedule_next_event()  # Re-arm for any signal pump pulsing, else disarm
         
         if self.status_led:
             self.status_led.off()
@@ -471,7 +677,7 @@ class ChemostatController:
             'chemostat_running': self.chemostat_running,
             'current_T': self.current_T,
             'signal_active': self.signal_active,
-            'pump_flow_rates': self.pump_flow_rates.copy()
+            'pump_flow_rates': {pid: self.pump_flow_rates[pid] for pid in range(1, 5)}
         }
         
         self.logger.log(f"\n📊 System Status:")
@@ -492,11 +698,13 @@ class ChemostatController:
     def emergency_stop(self):
         """Emergency stop all pumps"""
         self.logger.log("\n🚨 EMERGENCY STOP!")
+        self.logger.flush()  # Get buffered lines to disk before anything else can fail
         
         # Stop all timers
         try:
             self.timer1.deinit()
             self.timer2.deinit()
+            self.signal_timer.deinit()
             self.led_timer.deinit()
         except:
             pass
@@ -504,10 +712,13 @@ class ChemostatController:
         self.chemostat_running = False
         self.signal_active = False
         self.signal_pause_state = {'active': False}
+        self._work_pending &= ~_WORK_SIGNAL_PAUSE
         
         # Turn off all pumps
-        for pump_id in self.pumps:
-            self.set_pump_flow_rate(pump_id, 0)
+        for pump_id in range(1, 5):
+            if self.pumps[pump_id] is not None:
+                self.set_pump_flow_rate(pump_id, 0)
+        self.event_timer.deinit()
         
         # Flash status LED
         if self.status_led:
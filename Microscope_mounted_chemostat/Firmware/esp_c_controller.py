@@ -6,14 +6,30 @@ import utime
 import gc
 from machine import Pin, Timer, RTC, reset, WDT
 import network
-import ubinascii
+import socket
+import select
 from umqtt.simple import MQTTClient
 import sdcard
 import os
+import random
 import uasyncio as asyncio
+try:
+    import micropython
+    from micropython import const
+except ImportError:
+    # CPython (host tests/tools): literal constants, and identity stand-ins
+    # for the @micropython.native/viper compiler directives
+    class micropython:
+        @staticmethod
+        def native(func):
+            return func
+        viper = native
+    def const(value):
+        return value
 
 # Import configuration and hardware modules
 import config
+import netinfo
 from Hardware_modules.pump_controller import PumpBank
 from Hardware_modules.led_controller import QueuedLEDController
 
@@ -37,9 +53,8 @@ MQTT_BROKER = config.MQTT_BROKER
 MQTT_PORT = config.MQTT_PORT
 MQTT_KEEPALIVE = config.MQTT_KEEPALIVE
 
-# Get MAC address properly
-wlan_if = network.WLAN(network.STA_IF)
-MQTT_CLIENT_ID = f"esp_c{CHANNEL_ID}_" + ubinascii.hexlify(wlan_if.config('mac')).decode()
+# MAC address is formatted once in netinfo (imported by boot.py)
+MQTT_CLIENT_ID = f"esp_c{CHANNEL_ID}_" + netinfo.MAC_ID
 
 # MQTT Topics (formatted with channel ID)
 TOPIC_CMD_PUMP_BASE = config.TOPIC_CMD_PUMP_BASE.format(CHANNEL_ID, "{}")  # cmd/chan1/pump{}
@@ -49,6 +64,17 @@ TOPIC_CMD_RESET_VOLUMES = config.TOPIC_CMD_RESET_VOLUMES.format(CHANNEL_ID) # cm
 TOPIC_CMD_FLUSH = f"cmd/chan{CHANNEL_ID}/flush"                            # cmd/chan1/flush
 TOPIC_CMD_KILL = config.TOPIC_CMD_KILL                                     # cmd/kill
 TOPIC_STAT_CHANNEL = config.TOPIC_STAT_CHANNEL.format(CHANNEL_ID)          # stat/chan1
+_TOPIC_STAT_BYTES = TOPIC_STAT_CHANNEL.encode()  # Encoded once, not per publish
+_PUMP_TOPICS = tuple(TOPIC_CMD_PUMP_BASE.format(n).encode() for n in range(1, 5))  # b"cmd/chan1/pump1".. pump4
+
+# Fixed JSON layout of the 1 Hz status message, filled with one % operation
+_STATUS_TEMPLATE = (
+    '{"pump_duty": [%g, %g, %g, %g], "led_duty": %g, "queued": %d, '
+    '"total_volume": [%.3f, %.3f, %.3f, %.3f], "active_pump": %d, "uptime": %d, '
+    '"mqtt_timeout": %s, "emergency_stop": %s}'
+)
+_ZERO_PUMPS = (0, 0, 0, 0)
+_HIGHEST_PUMP = b"\x00\x01\x02\x02\x03\x03\x03\x03\x04\x04\x04\x04\x04\x04\x04\x04"  # 4-bit running mask -> pump id
 
 # Control parameters
 CONTROL_FREQ_HZ = config.CONTROL_FREQUENCY
@@ -56,11 +82,25 @@ assert CONTROL_FREQ_HZ == 1.0, "Control frequency must be 1.0 Hz per spec"
 
 MAX_COMMAND_DURATION = config.MAX_COMMAND_DURATION
 MQTT_TIMEOUT_SEC = config.MQTT_TIMEOUT_SEC
+_MQTT_TIMEOUT_MS = int(MQTT_TIMEOUT_SEC * 1000)  # Scaled once for check_mqtt_timeout()
 QUEUE_DEPTH = config.QUEUE_DEPTH
 
 # Safety and timing
 WIFI_RETRY_DELAY = 1.0  # Start with 1s, exponential backoff
 MAX_RETRY_DELAY = 60.0  # Maximum retry delay
+MQTT_DRAIN_MAX = const(16)  # Most packets handled per drain_mqtt() call
+MQTT_POLL_MS = const(10)    # Command dispatch latency of mqtt_listener()
+MQTT_SEND_TIMEOUT = 0.05    # Seconds a status publish may block on the socket
+
+# SD logging: lines collect in RAM and reach the card in block-sized writes
+LOG_BUFFER_SIZE = const(2048)
+LOG_FLUSH_BYTES = const(1536)        # Flush once this much is buffered...
+LOG_FLUSH_INTERVAL_MS = const(5000)  # ...or the oldest buffered line is this old
+LOG_ROTATE_LINES = const(10000)      # Start a new part file within the hour after this many lines
+JSON_CACHE_SIZE = const(8)           # Recent payloads kept parsed by _cached_loads()
+
+# Status LED half-period (ms) per mode: 2Hz normal, 10Hz timeout, 20Hz emergency
+_LED_PERIOD = {"normal": 250, "timeout": 50, "emergency": 25}
 
 # ================== GLOBAL STATE ==================
 
@@ -73,11 +113,15 @@ class SystemState:
         self.wifi_connected = False
         self.mqtt_timeout = False
         self.last_mqtt_message = utime.ticks_ms()
+        self.last_ping = 0  # ticks_ms of the last keepalive PINGREQ sent in timeout mode
         self.emergency_stop = False
         self.uptime_sec = 0
-        self.last_log_day = None
+        self.last_log_hour = None  # "YYYYMMDDHH" of the open log file
+        self.log_part = 0          # Part number within that hour (line-count rotation)
+        self.log_lines = 0         # Lines written to the open log file
         self.log_file = None
         self.led_mode = "normal"  # "normal", "timeout", "emergency"
+        self.led_period_ms = _LED_PERIOD["normal"]  # Half blink period for led_mode
         self.wifi_retry_delay = WIFI_RETRY_DELAY
         self.last_sd_retry = 0
         
@@ -85,12 +129,26 @@ state = SystemState()
 pump_bank = None
 led_controller = None
 mqtt_client = None
+mqtt_poll = None  # select.poll() on the MQTT socket, set up by connect_mqtt()
 status_led = None
 sd = None
 watchdog = None
+_RTC = RTC()  # One RTC handle shared by the log helpers
+
+# Timestamp cache for log_event: bursts within the same second reuse the string
+_log_stamp_key = -1   # day/hour/minute/second packed into one int
+_log_date_key = -1    # year/month/day packed into one int
+_log_date_prefix = ""  # "YYYY-MM-DD " for _log_date_key
+_log_stamp = ""
+_log_hour_key = -1    # date key * 24 + hour of the open log file
+
+_LOG_BUF = bytearray(LOG_BUFFER_SIZE)
+_log_len = 0          # Bytes of _LOG_BUF waiting to be written
+_log_first_ms = 0     # ticks_ms when the oldest buffered line was added
 
 # ================== UTILITY FUNCTIONS ==================
 
+@micropython.native
 def get_uptime():
     """Get system uptime in seconds."""
     return utime.ticks_ms() // 1000
@@ -101,13 +159,29 @@ def generate_command_id():
 
 # ================== WIFI MANAGEMENT ==================
 
-def connect_wifi():
-    """Connect to WiFi network with exponential backoff."""
+def backoff_retry_delay():
+    """Double the WiFi/MQTT retry delay (capped) with +/-25% jitter.
+    
+    The jitter keeps channels that lost the broker together from all
+    reconnecting in the same instant.
+    """
+    base = min(state.wifi_retry_delay * 2, MAX_RETRY_DELAY)
+    state.wifi_retry_delay = base * (0.75 + random.getrandbits(8) / 512)
+
+async def connect_wifi():
+    """Connect to WiFi network with exponential backoff, yielding to other tasks while waiting."""
     global state
     
     wlan = network.WLAN(network.STA_IF)
     wlan.active(True)
     
+    # Keep the radio awake: modem power-save holds incoming commands until the
+    # next DTIM beacon (100 ms - 2 s of latency)
+    try:
+        wlan.config(pm=getattr(network.WLAN, 'PM_NONE', 0))
+    except (AttributeError, TypeError, ValueError, OSError):
+        pass  # Older firmware without the pm option
+    
     if wlan.isconnected():
         state.wifi_connected = True
         state.wifi_retry_delay = WIFI_RETRY_DELAY  # Reset backoff
@@ -117,11 +191,10 @@ def connect_wifi():
     print(f"[WiFi] Connecting to {WIFI_SSID}...")
     wlan.connect(WIFI_SSID, WIFI_PASSWORD)
     
-    # Wait up to retry delay for connection
-    timeout = int(state.wifi_retry_delay)
-    while timeout > 0 and not wlan.isconnected():
-        utime.sleep(1)
-        timeout -= 1
+    # Wait up to retry delay for connection; control and MQTT tasks keep running
+    deadline = utime.ticks_add(utime.ticks_ms(), int(state.wifi_retry_delay * 1000))
+    while not wlan.isconnected() and utime.ticks_diff(deadline, utime.ticks_ms()) > 0:
+        await asyncio.sleep_ms(200)
     
     if wlan.isconnected():
         state.wifi_connected = True
@@ -131,9 +204,8 @@ def connect_wifi():
         return True
     else:
         state.wifi_connected = False
-        # Exponential backoff
-        state.wifi_retry_delay = min(state.wifi_retry_delay * 2, MAX_RETRY_DELAY)
-        print(f"[WiFi] Connection failed! Next retry in {state.wifi_retry_delay}s")
+        backoff_retry_delay()
+        print(f"[WiFi] Connection failed! Next retry in {state.wifi_retry_delay:.1f}s")
         return False
 
 # ================== MQTT MANAGEMENT ==================
@@ -143,58 +215,73 @@ def mqtt_callback(topic, msg):
     global state, pump_bank, led_controller
     
     try:
-        topic_str = topic.decode('utf-8')
-        msg_str = msg.decode('utf-8')
-        
-        print(f"[MQTT] Received: {topic_str} -> {msg_str}")
-        
         # Update last message time for timeout detection
         state.last_mqtt_message = utime.ticks_ms()
         
         # Clear timeout state if we were in timeout
         if state.mqtt_timeout:
             state.mqtt_timeout = False
-            state.led_mode = "normal"
+            set_led_mode("normal")
             print("[MQTT] Timeout cleared - resuming normal operation")
         
-        if topic_str == TOPIC_CMD_KILL:
-            print("[SAFETY] Emergency kill command received!")
-            emergency_shutdown()
-            
-        elif topic_str.startswith(f"cmd/chan{CHANNEL_ID}/pump"):
-            # Extract pump number from topic: cmd/chan1/pump2 -> pump 2
-            try:
-                pump_num = int(topic_str.split('pump')[1])
-                if 1 <= pump_num <= 4:
-                    handle_pump_command(pump_num, msg_str)
-                else:
-                    print(f"[MQTT] Invalid pump number: {pump_num}")
-            except (ValueError, IndexError):
-                print(f"[MQTT] Invalid pump topic format: {topic_str}")
-                
-        elif topic_str == TOPIC_CMD_LED:
-            handle_led_command(msg_str)
-            
-        elif topic_str == TOPIC_CMD_CALIBRATE:
-            handle_calibration_command(msg_str)
-            
-        elif topic_str == TOPIC_CMD_RESET_VOLUMES:
-            handle_reset_volumes_command(msg_str)
-            
-        elif topic_str == TOPIC_CMD_FLUSH:
-            handle_flush_command(msg_str)
+        # Dispatch on the raw topic bytes; only the chosen handler's payload is decoded
+        entry = TOPIC_HANDLERS.get(topic)
+        if entry is None:
+            print(f"[MQTT] Unhandled topic: {topic.decode('utf-8')}")
+            return
+        
+        handler, pump_num = entry
+        if pump_num is None:
+            handler(msg.decode('utf-8'))
+        else:
+            handler(pump_num, msg.decode('utf-8'))
             
     except Exception as e:
         print(f"[MQTT] Error processing message: {e}")
 
+def handle_kill_command(msg_str):
+    """Handle the global emergency kill command."""
+    print("[SAFETY] Emergency kill command received!")
+    emergency_shutdown()
+
+def _json_number(msg_str, key):
+    """Float value of a top-level "key" in a flat JSON object, or 0.0 if the key is absent."""
+    i = msg_str.find(key)
+    if i < 0:
+        return 0.0
+    start = msg_str.index(':', i + len(key)) + 1
+    end = start
+    n = len(msg_str)
+    while end < n and msg_str[end] not in ',}':
+        end += 1
+    return float(msg_str[start:end].strip().strip('"'))
+
+def _parse_duty_dur(msg_str):
+    """(duty, duration) from a command payload like {"duty":75,"dur":10}, without json.loads."""
+    return _json_number(msg_str, '"duty"'), _json_number(msg_str, '"dur"')
+
+# Parsed JSON for recently seen payloads, oldest first in _JSON_CACHE_ORDER.
+# Results are shared between calls, so handlers must treat them as read-only.
+_JSON_CACHE = {}
+_JSON_CACHE_ORDER = []
+
+def _cached_loads(msg_str):
+    """json.loads with a small cache, so repeated identical commands are parsed once."""
+    data = _JSON_CACHE.get(msg_str)
+    if data is None:
+        data = json.loads(msg_str)
+        if len(_JSON_CACHE_ORDER) >= JSON_CACHE_SIZE:
+            del _JSON_CACHE[_JSON_CACHE_ORDER.pop(0)]
+        _JSON_CACHE[msg_str] = data
+        _JSON_CACHE_ORDER.append(msg_str)
+    return data
+
 def handle_pump_command(pump_num, msg_str):
     """Handle pump control command."""
     global pump_bank
     
     try:
-        data = json.loads(msg_str)
-        duty = float(data.get('duty', 0))
-        duration = float(data.get('dur', 0))
+        duty, duration = _parse_duty_dur(msg_str)
         
         # Validate parameters
         if not (0 <= duty <= 100):
@@ -224,9 +311,7 @@ def handle_led_command(msg_str):
     global led_controller
     
     try:
-        data = json.loads(msg_str)
-        duty = float(data.get('duty', 0))
-        duration = float(data.get('dur', 0))
+        duty, duration = _parse_duty_dur(msg_str)
         
         # Validate parameters
         if not (0 <= duty <= 100):
@@ -256,7 +341,7 @@ def handle_calibration_command(msg_str):
     global pump_bank
     
     try:
-        calibrations = json.loads(msg_str)
+        calibrations = _cached_loads(msg_str)
         
         if pump_bank:
             # Convert string keys to integers
@@ -282,7 +367,7 @@ def handle_reset_volumes_command(msg_str):
     global pump_bank
     
     try:
-        data = json.loads(msg_str)
+        data = _cached_loads(msg_str)
         pump_ids = data.get('pumps', None)  # None = all pumps
         
         if pump_bank:
@@ -298,7 +383,7 @@ def handle_flush_command(msg_str):
     global pump_bank
     
     try:
-        data = json.loads(msg_str)
+        data = _cached_loads(msg_str)
         pump_ids = data.get('pumps', None)  # None = all pumps
         
         if pump_bank:
@@ -319,37 +404,60 @@ def handle_flush_command(msg_str):
     except Exception as e:
         print(f"[Flush] Error processing command: {e}")
 
+# Command topic (bytes, as delivered by umqtt) -> (handler, pump number or None)
+TOPIC_HANDLERS = {
+    TOPIC_CMD_KILL.encode(): (handle_kill_command, None),
+    TOPIC_CMD_LED.encode(): (handle_led_command, None),
+    TOPIC_CMD_CALIBRATE.encode(): (handle_calibration_command, None),
+    TOPIC_CMD_RESET_VOLUMES.encode(): (handle_reset_volumes_command, None),
+    TOPIC_CMD_FLUSH.encode(): (handle_flush_command, None),
+}
+for _i, _topic in enumerate(_PUMP_TOPICS):
+    TOPIC_HANDLERS[_topic] = (handle_pump_command, _i + 1)
+
 def connect_mqtt():
     """Connect to MQTT broker with full subscription."""
-    global mqtt_client, state
+    global mqtt_client, mqtt_poll, state
     
     try:
         mqtt_client = MQTTClient(MQTT_CLIENT_ID, MQTT_BROKER, port=MQTT_PORT, keepalive=MQTT_KEEPALIVE)
         mqtt_client.set_callback(mqtt_callback)
         mqtt_client.connect()
         
-        # Subscribe to all command topics
-        mqtt_client.subscribe(TOPIC_CMD_KILL)
-        mqtt_client.subscribe(TOPIC_CMD_LED)
-        mqtt_client.subscribe(TOPIC_CMD_CALIBRATE)
-        mqtt_client.subscribe(TOPIC_CMD_RESET_VOLUMES)
-        mqtt_client.subscribe(TOPIC_CMD_FLUSH)
+        # Send small command/status packets immediately instead of Nagle-batching
+        try:
+            mqtt_client.sock.setsockopt(getattr(socket, 'IPPROTO_TCP', 6),
+                                        getattr(socket, 'TCP_NODELAY', 1), 1)
+        except (AttributeError, OSError):
+            pass  # Socket layer without TCP options
+        
+        # Readiness check so drain_mqtt() only calls check_msg() when bytes are waiting
+        mqtt_poll = select.poll()
+        mqtt_poll.register(mqtt_client.sock, select.POLLIN)
         
-        # Subscribe to individual pump topics
-        for pump_num in range(1, 5):
-            topic = TOPIC_CMD_PUMP_BASE.format(pump_num)
+        # Subscribe to all command topics (including the individual pump topics)
+        for topic in TOPIC_HANDLERS:
             mqtt_client.subscribe(topic)
         
         state.mqtt_connected = True
         state.last_mqtt_message = utime.ticks_ms()
+        state.wifi_retry_delay = WIFI_RETRY_DELAY  # Reset backoff
         print(f"[MQTT] Connected as {MQTT_CLIENT_ID} (keepalive={MQTT_KEEPALIVE}s)")
         return True
         
     except Exception as e:
         state.mqtt_connected = False
+        backoff_retry_delay()
         print(f"[MQTT] Connection failed: {e}")
         return False
 
+def drain_mqtt():
+    """Handle every MQTT packet already received (up to MQTT_DRAIN_MAX) without blocking."""
+    for _ in range(MQTT_DRAIN_MAX):
+        if not mqtt_poll.poll(0):
+            break
+        mqtt_client.check_msg()
+
 def publish_status():
     """Publish channel status via MQTT."""
     global mqtt_client, state, pump_bank, led_controller
@@ -358,22 +466,28 @@ def publish_status():
         return
         
     try:
+        # In MQTT timeout the host is silent and the link may be the cause:
+        # skip building/sending status and only keep the broker session alive
+        # (a 2-byte PINGREQ every half keepalive) so incoming commands can still
+        # clear the timeout
+        if state.mqtt_timeout:
+            now = utime.ticks_ms()
+            if utime.ticks_diff(now, state.last_ping) >= MQTT_KEEPALIVE * 500:
+                mqtt_client.ping()
+                state.last_ping = now
+            return
+        
         # Get pump status
-        pump_duties = [0, 0, 0, 0]
-        total_volumes = [0.0, 0.0, 0.0, 0.0]
+        pump_duties = _ZERO_PUMPS
+        total_volumes = _ZERO_PUMPS
         active_pump = 0
         total_queued = 0
         
         if pump_bank:
-            pump_status = pump_bank.get_all_status()
-            for pump_id in range(1, 5):
-                if pump_id in pump_status:
-                    pump_duties[pump_id-1] = pump_status[pump_id]["duty_percent"]
-                    total_volumes[pump_id-1] = pump_status[pump_id]["total_volume_ml"]
-                    total_queued += pump_status[pump_id]["queue_length"]
-                    
-                    if pump_status[pump_id]["is_running"]:
-                        active_pump = pump_id
+            pump_duties, total_volumes, queue_len, running_mask = pump_bank.get_status_arrays()
+            total_queued = sum(queue_len)
+            # Highest-numbered running pump, as reported before (MicroPython ints have no bit_length)
+            active_pump = _HIGHEST_PUMP[running_mask & 0xF]
         
         # Get LED status
         led_duty = 0
@@ -383,20 +497,34 @@ def publish_status():
             led_duty = led_status["duty_percent"]
             led_queued = led_status["queue_length"]
         
-        status_data = {
-            "pump_duty": pump_duties,
-            "led_duty": led_duty,
-            "queued": total_queued + led_queued,
-            "total_volume": total_volumes,
-            "active_pump": active_pump,
-            "uptime": get_uptime(),
-            "mqtt_timeout": state.mqtt_timeout,
-            "emergency_stop": state.emergency_stop
-        }
-        
-        message = json.dumps(status_data)
-        mqtt_client.publish(TOPIC_STAT_CHANNEL, message, qos=1)
-        
+        message = _STATUS_TEMPLATE % (
+            pump_duties[0], pump_duties[1], pump_duties[2], pump_duties[3],
+            led_duty,
+            total_queued + led_queued,
+            total_volumes[0], total_volumes[1], total_volumes[2], total_volumes[3],
+            active_pump,
+            get_uptime(),
+            "false",  # mqtt_timeout: status is not published while timed out
+            "true" if state.emergency_stop else "false"
+        )
+        # Bound the send so broker back-pressure cannot stall the 1 Hz loop.
+        # qos=0: status is superseded every second, and a qos=1 PUBACK wait
+        # would fall under the same short timeout
+        sock = mqtt_client.sock
+        sock.settimeout(MQTT_SEND_TIMEOUT)
+        mqtt_client.publish(_TOPIC_STAT_BYTES, message)
+        sock.settimeout(None)
+        
+    except OSError as e:
+        # Timed out mid-packet: drop this status and let the main loop
+        # reconnect, since the stream may hold a partial packet. connect_mqtt()
+        # builds a new client, so close this socket rather than leak it
+        print(f"[MQTT] Status publish failed ({e}) - reconnecting")
+        try:
+            mqtt_client.sock.close()
+        except Exception:
+            pass
+        state.mqtt_connected = False
     except Exception as e:
         print(f"[MQTT] Error publishing status: {e}")
 
@@ -422,45 +550,51 @@ def init_sd_card():
         sd = None
         return False
 
-def get_log_filename():
-    """Generate log filename based on current date."""
-    rtc = RTC()
-    year, month, day, _, _, _, _, _ = rtc.datetime()
-    return f"/sd/chan{CHANNEL_ID}_log_{year:04d}{month:02d}{day:02d}.csv"
+def get_log_filename(hour_stamp, part=0):
+    """Log filename for an hour ("YYYYMMDDHH"), with a part suffix after the first file."""
+    suffix = f"_{part}" if part else ""
+    return f"/sd/chan{CHANNEL_ID}_log_{hour_stamp}{suffix}.csv"
 
 def init_log_file():
-    """Initialize or rotate log file."""
-    global state
+    """Initialize or rotate log file.
+    
+    Logs are partitioned by hour, and again every LOG_ROTATE_LINES lines, so
+    each file (and its FAT cluster chain) stays short.
+    """
+    global state, _log_hour_key
     
     if sd is None:
         return
     
     try:
-        rtc = RTC()
-        year, month, day, _, _, _, _, _ = rtc.datetime()
-        current_day = f"{year:04d}{month:02d}{day:02d}"
+        year, month, day, _, hour, _, _, _ = _RTC.datetime()
+        current_hour = f"{year:04d}{month:02d}{day:02d}{hour:02d}"
         
-        if state.last_log_day != current_day:
+        if state.last_log_hour != current_hour or state.log_lines >= LOG_ROTATE_LINES:
+            part = state.log_part + 1 if state.last_log_hour == current_hour else 0
             if state.log_file:
+                flush_log(force=True)
                 state.log_file.close()
             
-            filename = get_log_filename()
+            filename = get_log_filename(current_hour, part)
             
-            # Create header if file doesn't exist
-            file_exists = False
+            # Create header if file doesn't exist (stat only reads the directory entry)
             try:
-                with open(filename, 'r'):
-                    file_exists = True
-            except:
-                pass
+                os.stat(filename)
+                file_exists = True
+            except OSError:
+                file_exists = False
             
-            state.log_file = open(filename, 'a')
+            state.log_file = open(filename, 'ab')
             
             if not file_exists:
-                state.log_file.write(config.LOG_CSV_HEADER + "\n")
+                state.log_file.write((config.LOG_CSV_HEADER + "\n").encode())
                 state.log_file.flush()
             
-            state.last_log_day = current_day
+            state.last_log_hour = current_hour
+            state.log_part = part
+            state.log_lines = 0
+            _log_hour_key = ((year * 13 + month) * 32 + day) * 24 + hour
             print(f"[SD] Log file: {filename}")
             
     except Exception as e:
@@ -478,19 +612,59 @@ def retry_sd_card_init():
                 init_log_file()
         state.last_sd_retry = current_time
 
+def flush_log(force=False):
+    """Write buffered log lines to the SD card once enough bytes or time have accumulated."""
+    global _log_len
+    
+    if not _log_len:
+        return
+    if not force and _log_len < LOG_FLUSH_BYTES and \
+            utime.ticks_diff(utime.ticks_ms(), _log_first_ms) < LOG_FLUSH_INTERVAL_MS:
+        return
+    
+    try:
+        if state.log_file is not None:
+            state.log_file.write(memoryview(_LOG_BUF)[:_log_len])
+            state.log_file.flush()
+    except Exception as e:
+        print(f"[SD] Error flushing log: {e}")
+    _log_len = 0
+
 def log_event(event_type, details="", pump=0, duty=0, duration=0, led_duty=0, volume=0.0, command_id=""):
     """Log event to SD card."""
+    global _log_stamp_key, _log_date_key, _log_date_prefix, _log_stamp, _log_len, _log_first_ms
     if sd is None or state.log_file is None:
         return
     
     try:
-        rtc = RTC()
-        year, month, day, _, hour, minute, second, _ = rtc.datetime()
-        timestamp = f"{year:04d}-{month:02d}-{day:02d} {hour:02d}:{minute:02d}:{second:02d}"
-        
-        log_line = f"{timestamp},{pump},{duty},{duration},{led_duty},{volume:.3f},{command_id},{event_type}\n"
-        state.log_file.write(log_line)
-        state.log_file.flush()
+        year, month, day, _, hour, minute, second, _ = _RTC.datetime()
+        key = ((day * 24 + hour) * 60 + minute) * 60 + second
+        if key != _log_stamp_key:
+            date_key = (year * 13 + month) * 32 + day
+            if date_key != _log_date_key:
+                _log_date_prefix = f"{year:04d}-{month:02d}-{day:02d} "
+                _log_date_key = date_key
+            _log_stamp = f"{_log_date_prefix}{hour:02d}:{minute:02d}:{second:02d}"
+            _log_stamp_key = key
+            if date_key * 24 + hour != _log_hour_key:
+                init_log_file()  # New hour: buffered lines go to the old file first
+        if state.log_lines >= LOG_ROTATE_LINES:
+            init_log_file()
+        state.log_lines += 1
+        
+        log_line = f"{_log_stamp},{pump},{duty},{duration},{led_duty},{volume:.3f},{command_id},{event_type}\n"
+        line = log_line.encode()
+        n = len(line)
+        if _log_len + n > LOG_BUFFER_SIZE:
+            flush_log(force=True)
+        if n > LOG_BUFFER_SIZE:
+            state.log_file.write(line)  # Oversized line: write straight through
+        else:
+            if not _log_len:
+                _log_first_ms = utime.ticks_ms()
+            _LOG_BUF[_log_len:_log_len + n] = line
+            _log_len += n
+        flush_log()
         
     except Exception as e:
         print(f"[SD] Error logging event: {e}")
@@ -520,9 +694,11 @@ def emergency_shutdown():
     if led_controller:
         led_controller.emergency_stop()
     
-    state.led_mode = "emergency"
+    set_led_mode("emergency")
     log_event("EMERGENCY_STOP", "Kill command received")
+    flush_log(force=True)  # Get the stop record onto the card now
 
+@micropython.native
 def check_mqtt_timeout():
     """Check for MQTT communication timeout."""
     global state
@@ -532,11 +708,11 @@ def check_mqtt_timeout():
     
     elapsed_ms = utime.ticks_diff(utime.ticks_ms(), state.last_mqtt_message)
     
-    if elapsed_ms > (MQTT_TIMEOUT_SEC * 1000) and not state.mqtt_timeout:
+    if elapsed_ms > _MQTT_TIMEOUT_MS and not state.mqtt_timeout:
         print(f"[SAFETY] MQTT timeout after {elapsed_ms/1000:.1f}s - entering failsafe mode")
         
         state.mqtt_timeout = True
-        state.led_mode = "timeout"
+        set_led_mode("timeout")
         
         # Stop all pumps and LED
         if pump_bank:
@@ -549,24 +725,16 @@ def check_mqtt_timeout():
 
 # ================== LED STATUS CONTROL ==================
 
+def set_led_mode(mode):
+    """Switch the status LED pattern; the blink period is looked up once here."""
+    state.led_mode = mode
+    state.led_period_ms = _LED_PERIOD[mode]
+
+@micropython.native
 def update_status_led():
     """Handle status LED indication."""
-    global state, status_led
-    
-    if status_led is None:
-        return
-    
-    current_time = utime.ticks_ms()
-    
-    if state.led_mode == "normal":
-        # Slow blink (2Hz)
-        status_led.value((current_time // 250) % 2)
-    elif state.led_mode == "timeout":
-        # Fast blink (10Hz)
-        status_led.value((current_time // 50) % 2)
-    elif state.led_mode == "emergency":
-        # Very fast blink (20Hz)
-        status_led.value((current_time // 25) % 2)
+    if status_led is not None:
+        status_led.value((utime.ticks_ms() // state.led_period_ms) & 1)
 
 # ================== MAIN CONTROL LOOP ==================
 
@@ -600,13 +768,8 @@ def control_step():
         # Publish status via MQTT
         publish_status()
         
-        # Check MQTT connection (non-blocking)
-        if mqtt_client and state.mqtt_connected:
-            try:
-                mqtt_client.check_msg()  # Process incoming messages
-            except Exception as e:
-                print(f"[MQTT] Error checking messages: {e}")
-                state.mqtt_connected = False
+        # Write out buffered log lines that have waited long enough
+        flush_log()
         
         # Log periodic status if pumps are active
         if pump_bank:
@@ -628,6 +791,17 @@ async def control_timer_callback():
             print(f"[Timer] Control callback error: {e}")
             await asyncio.sleep_ms(1000)
 
+async def mqtt_listener():
+    """Async MQTT ingest task - dispatches commands within MQTT_POLL_MS of arrival."""
+    while True:
+        if mqtt_client and state.mqtt_connected and not state.emergency_stop:
+            try:
+                drain_mqtt()  # Process all waiting messages, not just one
+            except Exception as e:
+                print(f"[MQTT] Error checking messages: {e}")
+                state.mqtt_connected = False
+        await asyncio.sleep_ms(MQTT_POLL_MS)
+
 # ================== INITIALIZATION ==================
 
 def initialize_system():
@@ -656,8 +830,10 @@ def initialize_system():
     pump_bank = PumpBank(
         pump_pins=PUMP_PINS,
         calibrations=config.DEFAULT_CALIBRATION,
-        frequency=config.PWM_FREQUENCY
+        frequency=config.PWM_FREQUENCY,
+        max_queue=QUEUE_DEPTH
     )
+    pump_bank.update_all()  # One clean pass before WiFi comes up
     
     # Initialize LED controller
     print("[Init] Initializing LED controller...")
@@ -675,19 +851,8 @@ def initialize_system():
     else:
         print("[Warning] SD card not available - logging disabled, will retry periodically")
     
-    # Connect to WiFi
-    print("[Init] Connecting to WiFi...")
-    if not connect_wifi():
-        print("[Warning] WiFi connection failed - MQTT disabled")
-        return True  # Continue without MQTT
-    
-    # Connect to MQTT
-    print("[Init] Connecting to MQTT...")
-    if not connect_mqtt():
-        print("[Warning] MQTT connection failed")
-    
+    # WiFi/MQTT are brought up by main_async() once the control task is running
     print("[Init] System initialization complete!")
-    print(f"[Control] Ready for commands on channel {CHANNEL_ID}")
     return True
 
 # ================== MAIN PROGRAM ==================
@@ -700,14 +865,35 @@ async def main_async():
         print("[ERROR] System initialization failed!")
         return
     
+    # Init objects are long-lived: collect once, then let allocation pressure
+    # (not a timer) trigger further collections
+    gc.collect()
+    gc.collect()
+    gc.threshold(gc.mem_free() // 4 + gc.mem_alloc())
+    if hasattr(gc, 'freeze'):
+        gc.freeze()
+    
     print(f"[Main] ESP-C{CHANNEL_ID} controller running...")
     
     # Start control loop task
     control_task = asyncio.create_task(control_timer_callback())
     
+    # MQTT ingest runs on its own task so commands are not held for the 1 Hz tick
+    mqtt_task = asyncio.create_task(mqtt_listener())
+    
+    # Connect to WiFi (awaited, so the control loop keeps its 1 Hz tick meanwhile)
+    print("[Init] Connecting to WiFi...")
+    if not await connect_wifi():
+        print("[Warning] WiFi connection failed - MQTT disabled")
+    else:
+        # Connect to MQTT
+        print("[Init] Connecting to MQTT...")
+        if not connect_mqtt():
+            print("[Warning] MQTT connection failed")
+    print(f"[Control] Ready for commands on channel {CHANNEL_ID}")
+    
     # Main monitoring loop
     last_wifi_check = utime.ticks_ms()
-    last_gc_time = utime.ticks_ms()
     
     try:
         while True:
@@ -728,16 +914,11 @@ async def main_async():
             if utime.ticks_diff(current_time, last_wifi_check) > int(state.wifi_retry_delay * 1000):
                 if not state.wifi_connected:
                     print("[Main] Attempting WiFi reconnection...")
-                    connect_wifi()
+                    await connect_wifi()
                 elif not state.mqtt_connected:
                     print("[Main] Attempting MQTT reconnection...")
                     connect_mqtt()
-                last_wifi_check = current_time
-            
-            # Garbage collection every 5 seconds
-            if utime.ticks_diff(current_time, last_gc_time) > 5000:
-                gc.collect()
-                last_gc_time = current_time
+                last_wifi_check = utime.ticks_ms()  # Measure the next delay from after the attempt
             
             await asyncio.sleep_ms(100)  # 10Hz main loop
             
@@ -9,7 +9,7 @@
 ==========================================================
 """
 
-import machine, time, os
+import machine, time, os, sys, select
 
 # -------------------------------------------------------------------------
 # 1)  Pin map – adapt to your wiring once and forget about it
@@ -17,13 +17,34 @@ import machine, time, os
 PUMP_PINS = {1: 32, 2: 33, 3: 25, 4: 26}
 
 # -------------------------------------------------------------------------
-# 2)  Pump “profiles” – frequency & duty ceiling for each supply voltage
+# 2)  Pump “profiles” – frequency & duty resolution for each supply voltage
 #     You can add more entries (e.g. 9 V, 24 V) if you ever need them.
+#     max_duty is derived from bits: (1 << bits) - 1, e.g. 13 → 8191.
 # -------------------------------------------------------------------------
 PUMP_PROFILES = {
-    12: dict(freq=20_000, max_duty=8191),   # 20 kHz, full 13-bit resolution
-     5: dict(freq=10_000, max_duty=8191),   # 10 kHz – gentler for 5 V motors
+    12: dict(freq=20_000, bits=13),   # 20 kHz, full 13-bit resolution
+     5: dict(freq=10_000, bits=13),   # 10 kHz – gentler for 5 V motors
 }
+for _p in PUMP_PROFILES.values():
+    _p["max_duty"] = (1 << _p["bits"]) - 1
+
+# Rows written between explicit flushes of the CSV (the file is also
+# flushed when the session ends, including on Ctrl-C)
+FLUSH_EVERY = 8
+
+# One PWM (LEDC channel) per GPIO, reused across Pump() instances so that
+# re-running the calibration does not leak channels until the next GC
+_PWM_POOL = {}
+
+# While a prompt waits for input, stdin is polled in slices this long so an
+# optional watchdog can be fed in between (ms)
+STDIN_POLL_MS = 100
+_stdin_poll = select.poll()
+_stdin_poll.register(sys.stdin, select.POLLIN)
+
+# Hardware timer that stops a timed run on its own, even if the script is
+# interrupted or stuck between start() and stop()
+STOP_TIMER_ID = 0
 
 # -------------------------------------------------------------------------
 # 3)  Pump driver class
@@ -33,40 +54,73 @@ class Pump:
     Wraps one PWM output and exposes start()/stop() in human units:
         duty13 = 0…MAX_DUTY   (13-bit, like Arduino’s analogWrite on ESP32)
     """
-    def __init__(self, pin_id, *, freq, max_duty):
+    def __init__(self, pin_id, *, freq, bits, max_duty):
         self.max_duty = max_duty
-
-        pin  = machine.Pin(pin_id, machine.Pin.OUT)
-        self.pwm = machine.PWM(pin, freq=freq, duty=0)
+        self._shift = 16 - bits                    # 13-bit → duty_u16: << 3
+        self.pin_id = pin_id
+
+        self.pwm = _PWM_POOL.get(pin_id)
+        if self.pwm is None:
+            pin  = machine.Pin(pin_id, machine.Pin.OUT)
+            self.pwm = machine.PWM(pin, freq=freq, duty=0)
+            _PWM_POOL[pin_id] = self.pwm
+        else:                                      # reuse, new profile
+            self.pwm.duty_u16(0)
+            self.pwm.freq(freq)
+        self._set = self.pwm.duty_u16              # bound once
 
         print(f"[OK] Pump GPIO{pin_id} → {freq/1000:.0f} kHz, "
               f"range 0…{max_duty}")
 
-    # 0-8191 → 0-65535 for duty_u16()
-    @staticmethod
-    def _map_13b_to_16b(duty13):                   # const ≈ 8.0
-        return duty13 * 8
-
     def set_speed(self, duty13):
-        duty13 = max(0, min(duty13, self.max_duty))
-        self.pwm.duty_u16(self._map_13b_to_16b(duty13))
+        d = duty13
+        m = self.max_duty
+        d = 0 if d < 0 else (m if d > m else d)
+        self._set(d << self._shift)
 
     start = set_speed                 # alias
     def stop(self): self.set_speed(0) # helper
 
+    def deinit(self):
+        """Stop the pump and release its PWM channel."""
+        self.stop()
+        self.pwm.deinit()
+        _PWM_POOL.pop(self.pin_id, None)
+
 # -------------------------------------------------------------------------
 # 4)  Tiny REPL helpers
 # -------------------------------------------------------------------------
-def ask(prompt, _type=int):
+def read_line(prompt, wdt=None):
+    """input() that keeps feeding *wdt* until the operator starts typing."""
+    sys.stdout.write(prompt)
+    while not _stdin_poll.poll(STDIN_POLL_MS):
+        if wdt:
+            wdt.feed()
+    if wdt:
+        wdt.feed()
+    return input()
+
+def ask(prompt, _type=int, wdt=None):
     while True:
         try:
-            return _type(input(prompt))
+            return _type(read_line(prompt, wdt))
         except (ValueError, TypeError):
             print("Invalid input, try again.")
 
-def choose_filename(pump_id, supply_v):
+def run_for(duration, wdt=None):
+    """Sleep *duration* seconds, feeding *wdt* along the way."""
+    deadline = time.ticks_add(time.ticks_ms(), int(duration * 1000))
+    while True:
+        left = time.ticks_diff(deadline, time.ticks_ms())
+        if left <= 0:
+            break
+        if wdt:
+            wdt.feed()
+        time.sleep_ms(min(left, STDIN_POLL_MS))
+
+def choose_filename(pump_id, supply_v, wdt=None):
     default = f"pump{pump_id}_{supply_v}V_calib.csv"
-    name = input(f"CSV filename [{default}]: ").strip() or default
+    name = read_line(f"CSV filename [{default}]: ", wdt).strip() or default
 
     # Write header only if file is new / empty
     size = 0
@@ -75,77 +129,92 @@ def choose_filename(pump_id, supply_v):
     except OSError:
         pass
 
+    f = open(name, "a")                      # one handle for the whole session
     if size == 0:
-        with open(name, "w") as f:
-            f.write("pwm_duty_0-8191,duration_s,weight_g,flow_gps\n")
+        f.write("pwm_duty_0-8191,duration_s,weight_g,flow_gps\n")
         print(f"[NEW] {name} created → CSV header written.")
     else:
         print(f"[APPEND] Logging to existing {name}.")
 
-    return name
+    return name, f
 
 # -------------------------------------------------------------------------
 # 5)  Main routine
 # -------------------------------------------------------------------------
-def run_calibration():
+def run_calibration(wdt=None):
+    """
+    Interactive calibration session.  Pass a machine.WDT to have it fed
+    while prompts wait for input and while the pump runs; the ESP32 WDT
+    cannot be stopped again, so none is created here.
+    """
     print("\n=== Peristaltic-Pump Calibration ===")
 
     # ── 1.  Pump ID ──────────────────────────────────────────────────
     while True:
-        pid = ask("Pump ID (1-4): ")
+        pid = ask("Pump ID (1-4): ", wdt=wdt)
         if pid in PUMP_PINS:
             break
         print("Pick 1, 2, 3 or 4…")
 
     # ── 2.  Supply voltage / profile ────────────────────────────────
     while True:
-        supply_v = ask("Pump supply voltage? 5 or 12 V: ")
+        supply_v = ask("Pump supply voltage? 5 or 12 V: ", wdt=wdt)
         if supply_v in PUMP_PROFILES:
             profile = PUMP_PROFILES[supply_v]
             break
         print("Only 5 V and 12 V profiles exist right now – add more in code!")
 
     pump = Pump(PUMP_PINS[pid], **profile)
+    stop_timer = machine.Timer(STOP_TIMER_ID)
 
     # ── 3.  CSV file ────────────────────────────────────────────────
-    csv_file = choose_filename(pid, supply_v)
+    csv_file, f = choose_filename(pid, supply_v, wdt)
 
     # ── 4.  Calibration loop ───────────────────────────────────────
     max_duty = profile["max_duty"]
+    rows = 0
+    try:
+        while True:
+            duty = ask(f"PWM duty 0-{max_duty} (-1 to quit): ", wdt=wdt)
+            if duty == -1:
+                break
+            if not 0 <= duty <= max_duty:
+                print(f"Range is 0…{max_duty}.")
+                continue
+
+            duration = ask("Run time (s): ", wdt=wdt)
+            if duration <= 0:
+                print("Duration must be > 0.")
+                continue
+
+            read_line("Tare scale, then press <Enter>…", wdt)
+
+            # ---- Run pump ----
+            print(f"→ {duration}s @ duty {duty}")
+            pump.start(duty)
+            stop_timer.init(period=int(duration * 1000),
+                            mode=machine.Timer.ONE_SHOT,
+                            callback=lambda t: pump.stop())
+            run_for(duration, wdt)
+            pump.stop()                      # normally already off by now
+            print("   stopped.")
+
+            # ---- Record result ----
+            weight = ask("Weight (g): ", float, wdt)
+            flow   = weight / duration if duration else 0.0
+
+            line = f"{duty},{duration},{weight},{flow:.4f}\n"
+            print(line.rstrip())             # console echo
+
+            f.write(line)                    # append to disk
+            rows += 1
+            if rows % FLUSH_EVERY == 0:
+                f.flush()
+    finally:
+        stop_timer.deinit()
+        pump.deinit()                        # stops the pump, frees LEDC
+        f.close()                            # flushes the remaining rows
 
-    while True:
-        duty = ask(f"PWM duty 0-{max_duty} (-1 to quit): ")
-        if duty == -1:
-            break
-        if not 0 <= duty <= max_duty:
-            print(f"Range is 0…{max_duty}.")
-            continue
-
-        duration = ask("Run time (s): ")
-        if duration <= 0:
-            print("Duration must be > 0.")
-            continue
-
-        input("Tare scale, then press <Enter>…")
-
-        # ---- Run pump ----
-        print(f"→ {duration}s @ duty {duty}")
-        pump.start(duty)
-        time.sleep(duration)
-        pump.stop()
-        print("   stopped.")
-
-        # ---- Record result ----
-        weight = ask("Weight (g): ", float)
-        flow   = weight / duration if duration else 0.0
-
-        line = f"{duty},{duration},{weight},{flow:.4f}\n"
-        print(line.rstrip())                 # console echo
-
-        with open(csv_file, "a") as f:       # append to disk
-            f.write(line)
-
-    pump.stop()
     print("Done.  Data saved to ➜", csv_file)
 
 # -------------------------------------------------------------------------
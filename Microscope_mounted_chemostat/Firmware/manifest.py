@@ -0,0 +1,13 @@
+# manifest.py - Frozen-bytecode build for the MCMC ESP-C Channel Controller
+# Build with: make -C ports/esp32 BOARD=ESP32_GENERIC FROZEN_MANIFEST=<path>/manifest.py
+# Frozen modules run from flash without parsing at boot. opt=3 strips
+# docstrings, asserts and line numbers (same as mpy-cross -O3).
+
+include("$(PORT_DIR)/boards/manifest.py")  # Keep the port's default frozen modules
+
+module("esp_c_controller.py", opt=3)
+module("netinfo.py", opt=3)
+package("Hardware_modules", opt=3)
+
+# config.py (per-channel settings), boot.py and main.py stay on the filesystem
+# so a channel can be reconfigured without rebuilding the firmware.
@@ -0,0 +1,9 @@
+# netinfo.py - Station MAC address, read and formatted once at import
+# boot.py imports this first; later imports (esp_c_controller) reuse the cached module.
+import network
+import ubinascii
+
+_mac = network.WLAN(network.STA_IF).config('mac')
+MAC_HEX = ubinascii.hexlify(_mac, ':').decode()  # aa:bb:cc:dd:ee:ff (display)
+MAC_ID = ubinascii.hexlify(_mac).decode()        # aabbccddeeff (client ids)
+del _mac
@@ -3,12 +3,56 @@ import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 import os
 
-def _make_time_series(duration_min, dt_min=0.1):
-    """Return time vector in minutes."""
-    t = np.arange(0, duration_min + dt_min, dt_min)
-    return t
+def _make_time_series(duration_min, *breakpoints):
+    """Return the time vertices (minutes) of a piecewise-linear profile.
+    
+    The temperature is linear between events, so 0, the event times and the
+    end of the run are enough to draw it exactly.
+    """
+    return np.unique(np.array((0, duration_min) + breakpoints, dtype=float))
+
+def _ramp(x, x0, x1, y0, y1):
+    """Linear ramp from (x0, y0) to (x1, y1), evaluated at x."""
+    return y0 + (y1 - y0) * (x - x0) / (x1 - x0)
+
+_style_applied = False
+
+def _apply_style():
+    """Select the plot style and fonts once per process."""
+    global _style_applied
+    if _style_applied:
+        return
+    
+    # Try to use a clean style, fallback to default
+    try:
+        plt.style.use('seaborn-v0_8-whitegrid')
+    except OSError:
+        try:
+            plt.style.use('seaborn-whitegrid')
+        except OSError:
+            plt.style.use('default')
+            plt.rcParams['grid.alpha'] = 0.3
+    
+    # Global Font Settings for "Poster/Talk" quality
+    plt.rcParams.update({
+        'font.size': 12,
+        'axes.titlesize': 16,
+        'axes.labelsize': 14,
+        'xtick.labelsize': 12,
+        'ytick.labelsize': 12,
+        'font.family': 'sans-serif'
+    })
+    _style_applied = True
 
 def plot_paradigm():
+    output_path = os.path.join(os.path.dirname(__file__), 'experimental_paradigm_graphic_abstract.png')
+    
+    # Skip rendering when the PNG is newer than this script (set FORCE=1 to redraw)
+    if (not os.environ.get('FORCE') and os.path.exists(output_path)
+            and os.stat(output_path).st_mtime > os.stat(__file__).st_mtime):
+        print(f"Figure up to date: {output_path}")
+        return
+    
     # --- Configuration ---
     duration_train_min = 300
     duration_test_min = 180
@@ -25,34 +69,14 @@ def plot_paradigm():
     col_cue_text = '#d35400'    # Pumpkin
     col_bg = '#ffffff'          # White
     
-    # Setup Figure
-    # Try to use a clean style, fallback to default
-    available_styles = plt.style.available
-    if 'seaborn-v0_8-whitegrid' in available_styles:
-        plt.style.use('seaborn-v0_8-whitegrid')
-    elif 'seaborn-whitegrid' in available_styles:
-        plt.style.use('seaborn-whitegrid')
-    else:
-        plt.style.use('default')
-        plt.rcParams['grid.alpha'] = 0.3
-
+    # Setup Figure (style and fonts must be set before the axes are created)
+    _apply_style()
     fig, axes = plt.subplots(3, 1, figsize=(12, 10), constrained_layout=True)
-    
-    # Global Font Settings for "Poster/Talk" quality
-    plt.rcParams.update({
-        'font.size': 12,
-        'axes.titlesize': 16,
-        'axes.labelsize': 14,
-        'xtick.labelsize': 12,
-        'ytick.labelsize': 12,
-        'font.family': 'sans-serif'
-    })
 
     # ==========================================
     # Panel 1: Predictable Environment (Training)
     # ==========================================
     ax = axes[0]
-    t = _make_time_series(duration_train_min)
     
     # Define Events
     # Cycle: Wait -> Cue (30m) -> Heat (30m) -> Recovery
@@ -63,22 +87,21 @@ def plot_paradigm():
     heat_dur = 30
     ramp_dur = 10
     
-    # Temperature Profile
-    temp = np.full_like(t, basal_temp)
-    
-    # Heat Ramp Up
-    ramp_mask = (t >= heat_start) & (t < heat_start + ramp_dur)
-    temp[ramp_mask] = np.linspace(basal_temp, heat_shock_temp, np.sum(ramp_mask))
-    
-    # Heat Plateau
-    plateau_mask = (t >= heat_start + ramp_dur) & (t < heat_start + heat_dur)
-    temp[plateau_mask] = heat_shock_temp
-    
-    # Recovery (Ramp Down)
+    # Temperature Profile: ramp up -> plateau -> ramp down (recovery), basal elsewhere
     rec_start = heat_start + heat_dur
     rec_dur = 10
-    rec_mask = (t >= rec_start) & (t < rec_start + rec_dur)
-    temp[rec_mask] = np.linspace(heat_shock_temp, basal_temp, np.sum(rec_mask))
+    t = _make_time_series(duration_train_min, heat_start, heat_start + ramp_dur,
+                          rec_start, rec_start + rec_dur)
+    temp = np.piecewise(t, [
+        (t >= heat_start) & (t < heat_start + ramp_dur),
+        (t >= heat_start + ramp_dur) & (t < rec_start),
+        (t >= rec_start) & (t < rec_start + rec_dur),
+    ], [
+        lambda x: _ramp(x, heat_start, heat_start + ramp_dur, basal_temp, heat_shock_temp),
+        heat_shock_temp,
+        lambda x: _ramp(x, rec_start, rec_start + rec_dur, heat_shock_temp, basal_temp),
+        basal_temp,
+    ])
     
     # Plotting
     # 1. Cue Region
@@ -119,20 +142,20 @@ def plot_paradigm():
     vib_dur_2 = 15
     heat_start_2 = 200
     
-    temp2 = np.full_like(t, basal_temp)
-    
-    # Heat Ramp Up
-    ramp_mask2 = (t >= heat_start_2) & (t < heat_start_2 + ramp_dur)
-    temp2[ramp_mask2] = np.linspace(basal_temp, heat_shock_temp, np.sum(ramp_mask2))
-    
-    # Heat Plateau
-    plateau_mask2 = (t >= heat_start_2 + ramp_dur) & (t < heat_start_2 + heat_dur)
-    temp2[plateau_mask2] = heat_shock_temp
-    
-    # Recovery
+    # Same heat profile as panel A, shifted to heat_start_2
     rec_start2 = heat_start_2 + heat_dur
-    rec_mask2 = (t >= rec_start2) & (t < rec_start2 + rec_dur)
-    temp2[rec_mask2] = np.linspace(heat_shock_temp, basal_temp, np.sum(rec_mask2))
+    t2 = _make_time_series(duration_train_min, heat_start_2, heat_start_2 + ramp_dur,
+                           rec_start2, rec_start2 + rec_dur)
+    temp2 = np.piecewise(t2, [
+        (t2 >= heat_start_2) & (t2 < heat_start_2 + ramp_dur),
+        (t2 >= heat_start_2 + ramp_dur) & (t2 < rec_start2),
+        (t2 >= rec_start2) & (t2 < rec_start2 + rec_dur),
+    ], [
+        lambda x: _ramp(x, heat_start_2, heat_start_2 + ramp_dur, basal_temp, heat_shock_temp),
+        heat_shock_temp,
+        lambda x: _ramp(x, rec_start2, rec_start2 + rec_dur, heat_shock_temp, basal_temp),
+        basal_temp,
+    ])
     
     # Plotting
     # LED Block
@@ -145,8 +168,8 @@ def plot_paradigm():
     ax.text(vib_start_2 + vib_dur_2/2, 36, "Random\nVib", 
             ha='center', va='center', color=col_cue_text, fontweight='bold', fontsize=10)
             
-    ax.plot(t, temp2, color=col_temp_line, linewidth=3)
-    ax.fill_between(t, temp2, basal_temp, where=(temp2 > basal_temp), 
+    ax.plot(t2, temp2, color=col_temp_line, linewidth=3)
+    ax.fill_between(t2, temp2, basal_temp, where=(temp2 > basal_temp), 
                     color=col_heat_fill, alpha=0.2, interpolate=True)
     
     ax.set_title("B. Random Environment (Control Group)", loc='left', fontweight='bold')
@@ -164,7 +187,6 @@ def plot_paradigm():
     # Panel 3: Survival Test
     # ==========================================
     ax = axes[2]
-    t3 = _make_time_series(duration_test_min)
     
     # Sequence: Cue (30m) -> Ramp to Lethal (38C)
     cue_dur_test = 30
@@ -172,14 +194,16 @@ def plot_paradigm():
     ramp_start_3 = 30
     ramp_end_3 = ramp_start_3 + ramp_test_dur
     
-    temp3 = np.full_like(t3, basal_temp)
-    
-    # Ramp
-    ramp_mask3 = (t3 >= ramp_start_3) & (t3 < ramp_end_3)
-    temp3[ramp_mask3] = np.linspace(basal_temp, challenge_temp, np.sum(ramp_mask3))
-    
-    # Plateau (Lethal)
-    temp3[t3 >= ramp_end_3] = challenge_temp
+    # Ramp, then lethal plateau to the end
+    t3 = _make_time_series(duration_test_min, ramp_start_3, ramp_end_3)
+    temp3 = np.piecewise(t3, [
+        (t3 >= ramp_start_3) & (t3 < ramp_end_3),
+        t3 >= ramp_end_3,
+    ], [
+        lambda x: _ramp(x, ramp_start_3, ramp_end_3, basal_temp, challenge_temp),
+        challenge_temp,
+        basal_temp,
+    ])
     
     # Plotting
     # Increased alpha for intensity
@@ -207,7 +231,6 @@ def plot_paradigm():
                 ha='center')
 
     # Save
-    output_path = os.path.join(os.path.dirname(__file__), 'experimental_paradigm_graphic_abstract.png')
     plt.savefig(output_path, dpi=300, bbox_inches='tight')
     print(f"Figure saved to: {output_path}")
     # plt.show() # Commented out for headless environments, but useful if running locally
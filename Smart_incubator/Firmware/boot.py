@@ -1,7 +1,6 @@
 # This is script that run when device boot up or wake from sleep.
 import gc
 import machine
-import time
 
 # Display welcome message
 print("Capsaspora Incubator System Booting...")
@@ -9,58 +8,37 @@ print("ESP32 MicroPython Firmware")
 
 # STAGE 1: Critical GPIO initialization
 print("STAGE 1: Securing GPIO pins...")
-try:
-    # Initialize all control pins as outputs with safe states
-    heater_pin = machine.Pin(33, machine.Pin.OUT)
-    cooler_pin = machine.Pin(27, machine.Pin.OUT) 
-    led_pin = machine.Pin(25, machine.Pin.OUT)
-    vib_pin = machine.Pin(16, machine.Pin.OUT)
-    
-    # Set all to OFF/LOW state
-    heater_pin.value(0)
-    cooler_pin.value(0)
-    led_pin.value(0)
-    vib_pin.value(0)
-    
-    # Initialize SPI CS pins as outputs and set HIGH (inactive)
-    cs_max_pin = machine.Pin(5, machine.Pin.OUT)
-    cs_sd_pin = machine.Pin(15, machine.Pin.OUT)
-    cs_max_pin.value(1)  # CS pins are active low
-    cs_sd_pin.value(1)
-    
-    print("✓ GPIO pins secured")
-    
-except Exception as e:
-    print(f"⚠ GPIO initialization failed: {e}")
-    # Continue anyway - don't let this stop the boot
-
-# STAGE 2: System stabilization
-print("STAGE 2: System stabilization...")
-time.sleep(0.5)  # Allow hardware to stabilize
+# (gpio, safe level): heater, cooler, LED, vibration off; MAX31865 and SD
+# chip selects high (active low)
+PIN_INIT = ((33, 0), (27, 0), (25, 0), (16, 0), (5, 1), (15, 1))
+for gpio, val in PIN_INIT:
+    try:
+        machine.Pin(gpio, machine.Pin.OUT, value=val)
+    except Exception as e:
+        print(f"⚠ GPIO{gpio} initialization failed: {e}")
+        # Continue anyway - don't let this stop the boot
+print("✓ GPIO pins secured")
 
-# STAGE 3: CPU configuration
-print("STAGE 3: CPU configuration...")
+# STAGE 2: CPU configuration
+print("STAGE 2: CPU configuration...")
 try:
     machine.freq(240000000)
     print("✓ CPU frequency set to 240MHz")
 except:
     print("⚠ CPU frequency setting failed")
 
-# STAGE 4: Memory management
-print("STAGE 4: Memory management...")
+# STAGE 3: Memory management
+print("STAGE 3: Memory management...")
 gc.enable()
 gc.collect()
 print("✓ Memory cleanup completed")
 
-# STAGE 5: Final stabilization
-print("STAGE 5: Final stabilization...")
-time.sleep(1.0)  # Longer delay for complete system stabilization
-
 # BOOT button check temporarily disabled for external power compatibility
 # Uncomment the section below if you need update mode functionality
 
 # # Check if BOOT button is pressed to enter update mode
 # # Use multiple readings to avoid false triggers from floating pins
+# import time
 # boot_pin = machine.Pin(0, machine.Pin.IN, machine.Pin.PULL_UP)
 # time.sleep(0.1)  # Allow pin to stabilize
 # 
@@ -105,7 +83,6 @@ except Exception as e:
 # Only run main if NOT in deployment mode
 if not deployment_mode_active:
     print("=== Starting Web Server Mode ===\n")
-    time.sleep(0.5)
     print("Starting Main Program...")
     
     try:
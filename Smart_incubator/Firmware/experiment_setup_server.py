@@ -2,16 +2,103 @@
 import socket
 import time
 import gc
+import io
+import select
 from machine import RTC
+try:
+    import deflate  # MicroPython 1.21+; compression needs a port built with it
+except ImportError:
+    deflate = None
+
+# Free heap below which the page render collects first (bytes)
+RENDER_MIN_FREE = 20000
+# Age within which /t serves the last reading instead of re-reading SPI (ms)
+TEMP_CACHE_MS = 500
+
+def _unquote(s):
+    """Decode a form-urlencoded value ('+' and every %XX) in one pass."""
+    if '%' not in s and '+' not in s:
+        return s
+    out = bytearray()
+    i = 0
+    n = len(s)
+    while i < n:
+        c = s[i]
+        if c == '+':
+            out.append(32)
+            i += 1
+        elif c == '%' and i + 2 < n:
+            try:
+                out.append(int(s[i+1:i+3], 16))
+                i += 3
+            except ValueError:
+                out.append(37)
+                i += 1
+        else:
+            out.extend(c.encode())
+            i += 1
+    try:
+        return out.decode('utf-8')  # %XX bytes may form multi-byte UTF-8
+    except UnicodeError:
+        return s
 
 class ExperimentSetupServer:
+    # Responses are kept as bytes so they go to the socket without re-encoding
+    _OK_HTML = b"HTTP/1.1 200 OK\r\nContent-Type:text/html\r\n\r\n"
+    _OK_TEXT = b"HTTP/1.1 200 OK\r\nContent-Type:text/plain\r\n\r\n"
+    _REDIRECT = b"HTTP/1.1 302 Found\r\nLocation:/\r\n\r\n"
+    _BAD_REQUEST = b"HTTP/1.1 400 Bad Request\r\n\r\n"
+    _ERROR = b"HTTP/1.1 500 Error\r\n\r\nError"
+    # Static parts of the main page, kept out of the per-render string building
+    _CSS = b"""<style>
+*{box-sizing:border-box;margin:0;padding:0}
+body{font-family:sans-serif;background:#1a1a2e;color:#fff;padding:10px}
+.c{max-width:400px;margin:0 auto}
+h1{color:#0df;font-size:1.2em;text-align:center;margin:10px 0}
+.card{background:#222;border-radius:8px;padding:12px;margin:8px 0}
+label{display:block;color:#aaa;font-size:0.85em;margin:8px 0 3px}
+input,select{width:100%;padding:8px;border:1px solid #444;border-radius:4px;background:#333;color:#fff;font-size:16px}
+.row{display:flex;gap:8px}
+.row>div{flex:1}
+button{width:100%;padding:12px;border:none;border-radius:6px;font-size:1em;cursor:pointer;margin:5px 0}
+.btn-blue{background:#0af;color:#000}
+.btn-green{background:#0c6;color:#000;font-size:1.1em}
+.btn-orange{background:#f80;color:#000;font-size:1.1em}
+.btn-gray{background:#444;color:#fff}
+.status{text-align:center;padding:8px;background:#333;border-radius:4px;margin:5px 0}
+.tabs{display:flex;gap:5px;margin-bottom:10px}
+.tab{flex:1;padding:10px;border:none;border-radius:6px 6px 0 0;cursor:pointer;font-weight:bold}
+.tab-exp{background:#0c6;color:#000}
+.tab-stress{background:#f80;color:#000}
+.tab.inactive{opacity:0.5}
+.panel{display:none}
+.panel.active{display:block}
+</style></head><body><div class="c">
+"""
+    _JS = b"""<script>
+function n(){var d=new Date();document.getElementById('d').value=d.toISOString().slice(0,10);document.getElementById('tm').value=d.toTimeString().slice(0,5)}
+function showPanel(p){document.getElementById('panelExp').className=p=='exp'?'panel active':'panel';document.getElementById('panelStress').className=p=='stress'?'panel active':'panel';document.getElementById('tabExp').className=p=='exp'?'tab tab-exp':'tab tab-exp inactive';document.getElementById('tabStress').className=p=='stress'?'tab tab-stress':'tab tab-stress inactive'}
+n();setInterval(function(){fetch('/t').then(r=>r.text()).then(d=>{document.getElementById('t').textContent=d}).catch(e=>{})},3000);
+</script></body></html>"""
+    
     def __init__(self, device_id=""):
         self.socket = None
+        self._poller = None
         self.device_id = device_id
         self.experiment_started = False
         self.stress_test_started = False
         self.rtc = RTC()
         self.time_set = False
+        self._page = None     # Cached main page response; None = re-render
+        self._page_gz = None  # Same response gzip-compressed, if available
+        try:
+            from max31865 import read_temperature
+            self._read_temp = read_temperature
+        except ImportError as e:
+            print(f"[Server] No temperature sensor: {e}")
+            self._read_temp = None
+        self._temp_body = b"--"  # Last /t reply body and when it was read
+        self._temp_ms = None
         self.config = {
             'experiment_name': f'exp_{device_id}',
             'correlation': 1.0,
@@ -42,9 +129,50 @@ class ExperimentSetupServer:
     def set_datetime(self, year, month, day, hour, minute):
         self.rtc.datetime((year, month, day, 0, hour, minute, 0, 0))
         self.time_set = True
+        self._page = None
+    
+    def get_page(self, gzip_ok=False):
+        """Main page response (headers + body), rendered once per config change."""
+        if self._page is None:
+            if gc.mem_free() < RENDER_MIN_FREE:
+                gc.collect()
+            html = self.get_html()
+            # Plain and gzip bodies share one URL, so caches must key on Accept-Encoding
+            self._page = (b"HTTP/1.1 200 OK\r\nContent-Type:text/html\r\n"
+                          b"Vary:Accept-Encoding\r\n\r\n" + html)
+            self._page_gz = None
+            if deflate:
+                try:
+                    buf = io.BytesIO()
+                    f = deflate.DeflateIO(buf, deflate.GZIP)
+                    f.write(html)
+                    f.close()
+                    self._page_gz = (b"HTTP/1.1 200 OK\r\nContent-Type:text/html\r\n"
+                                     b"Content-Encoding:gzip\r\nVary:Accept-Encoding\r\n\r\n" + buf.getvalue())
+                except Exception:
+                    pass  # No compression support: serve plain
+        if gzip_ok and self._page_gz:
+            return self._page_gz
+        return self._page
+    
+    def get_temp_body(self):
+        """Current temperature as '23.4' (or '--'), re-read at most every TEMP_CACHE_MS."""
+        now = time.ticks_ms()
+        if self._temp_ms is not None and time.ticks_diff(now, self._temp_ms) < TEMP_CACHE_MS:
+            return self._temp_body
+        body = b"--"
+        if self._read_temp:
+            try:
+                t = self._read_temp()
+                if t is not None:
+                    body = ("%.1f" % t).encode()
+            except Exception:
+                pass
+        self._temp_body = body
+        self._temp_ms = now
+        return body
     
     def get_html(self):
-        gc.collect()
         c = self.config
         s = self.stress_config
         ts = "SET" if self.time_set else "NOT SET"
@@ -58,33 +186,14 @@ class ExperimentSetupServer:
         sut_vib = "selected" if s['us_type']=="VIB" else ""
         start_dis = "disabled" if not self.time_set else ""
         
-        return """<!DOCTYPE html><html><head><title>Incubator """ + self.device_id + """</title>
+        # Static style and script are class-level bytes; only the dynamic
+        # head and body are built here
+        return b"".join((
+            ("""<!DOCTYPE html><html><head><title>Incubator """ + self.device_id + """</title>
 <meta name="viewport" content="width=device-width,initial-scale=1">
-<style>
-*{box-sizing:border-box;margin:0;padding:0}
-body{font-family:sans-serif;background:#1a1a2e;color:#fff;padding:10px}
-.c{max-width:400px;margin:0 auto}
-h1{color:#0df;font-size:1.2em;text-align:center;margin:10px 0}
-.card{background:#222;border-radius:8px;padding:12px;margin:8px 0}
-label{display:block;color:#aaa;font-size:0.85em;margin:8px 0 3px}
-input,select{width:100%;padding:8px;border:1px solid #444;border-radius:4px;background:#333;color:#fff;font-size:16px}
-.row{display:flex;gap:8px}
-.row>div{flex:1}
-button{width:100%;padding:12px;border:none;border-radius:6px;font-size:1em;cursor:pointer;margin:5px 0}
-.btn-blue{background:#0af;color:#000}
-.btn-green{background:#0c6;color:#000;font-size:1.1em}
-.btn-orange{background:#f80;color:#000;font-size:1.1em}
-.btn-gray{background:#444;color:#fff}
-.status{text-align:center;padding:8px;background:#333;border-radius:4px;margin:5px 0}
-.tabs{display:flex;gap:5px;margin-bottom:10px}
-.tab{flex:1;padding:10px;border:none;border-radius:6px 6px 0 0;cursor:pointer;font-weight:bold}
-.tab-exp{background:#0c6;color:#000}
-.tab-stress{background:#f80;color:#000}
-.tab.inactive{opacity:0.5}
-.panel{display:none}
-.panel.active{display:block}
-</style></head><body><div class="c">
-<h1>Incubator """ + self.device_id + """</h1>
+""").encode(),
+            self._CSS,
+            ("""<h1>Incubator """ + self.device_id + """</h1>
 <div class="card">
 <div class="status">Time: """ + ts + """ | Temp: <span id="t">--</span>C</div>
 <form method="POST" action="/time">
@@ -163,11 +272,8 @@ button{width:100%;padding:12px;border:none;border-radius:6px;font-size:1em;curso
 </form>
 </div>
 </div>
-<script>
-function n(){var d=new Date();document.getElementById('d').value=d.toISOString().slice(0,10);document.getElementById('tm').value=d.toTimeString().slice(0,5)}
-function showPanel(p){document.getElementById('panelExp').className=p=='exp'?'panel active':'panel';document.getElementById('panelStress').className=p=='stress'?'panel active':'panel';document.getElementById('tabExp').className=p=='exp'?'tab tab-exp':'tab tab-exp inactive';document.getElementById('tabStress').className=p=='stress'?'tab tab-stress':'tab tab-stress inactive'}
-n();setInterval(function(){fetch('/t').then(r=>r.text()).then(d=>{document.getElementById('t').textContent=d}).catch(e=>{})},3000);
-</script></body></html>"""
+""").encode(),
+            self._JS))
     
     def get_done_html(self, mode='experiment'):
         if mode == 'stress':
@@ -193,43 +299,50 @@ n();setInterval(function(){fetch('/t').then(r=>r.text()).then(d=>{document.getEl
             for pair in body.split('&'):
                 if '=' in pair:
                     k, v = pair.split('=', 1)
-                    params[k.replace('%20',' ')] = v.replace('%20',' ').replace('%3A',':').replace('+',' ')
+                    params[_unquote(k)] = _unquote(v)
         return params
     
+    @staticmethod
+    def _body(req, hdr_end):
+        """Decoded request body following the blank line at hdr_end ("" if none)."""
+        return req[hdr_end + 4:].decode('utf-8') if hdr_end >= 0 else ""
+    
     def handle(self, req):
+        """Build the response for one raw (bytes) HTTP request."""
         try:
-            lines = req.split('\n')
-            if not lines:
-                return "HTTP/1.1 400 Bad Request\r\n\r\n"
+            # Request line "METHOD PATH VERSION" and the header/body split, found
+            # by scanning the bytes once; only the form body is ever decoded
+            eol = req.find(b'\r\n')
+            if eol < 0:
+                eol = len(req)
+            sp1 = req.find(b' ', 0, eol)
+            if sp1 <= 0:
+                return self._BAD_REQUEST
+            sp2 = req.find(b' ', sp1 + 1, eol)
+            if sp2 < 0:
+                sp2 = eol
+            method = req[:sp1]
+            path = req[sp1 + 1:sp2]
+            if not path:
+                return self._BAD_REQUEST
+            hdr_end = req.find(b'\r\n\r\n')
             
-            parts = lines[0].strip().split(' ')
-            if len(parts) < 2:
-                return "HTTP/1.1 400 Bad Request\r\n\r\n"
+            if path == b'/t':
+                return self._OK_TEXT + self.get_temp_body()
             
-            method, path = parts[0], parts[1]
-            
-            if path == '/t':
-                try:
-                    from max31865 import read_temperature
-                    t = read_temperature()
-                    return f"HTTP/1.1 200 OK\r\nContent-Type:text/plain\r\n\r\n{t:.1f}"
-                except:
-                    return "HTTP/1.1 200 OK\r\nContent-Type:text/plain\r\n\r\n--"
-            
-            if path == '/time' and method == 'POST':
-                body = req.split('\r\n\r\n')[1] if '\r\n\r\n' in req else ""
-                p = self.parse_form(body)
+            if path == b'/time' and method == b'POST':
+                p = self.parse_form(self._body(req, hdr_end))
                 try:
                     d = p.get('d', '').split('-')
                     t = p.get('t', '').split(':')
                     self.set_datetime(int(d[0]), int(d[1]), int(d[2]), int(t[0]), int(t[1]))
                 except:
                     pass
-                return "HTTP/1.1 302 Found\r\nLocation:/\r\n\r\n"
+                return self._REDIRECT
             
-            if path == '/cfg' and method == 'POST':
-                body = req.split('\r\n\r\n')[1] if '\r\n\r\n' in req else ""
-                p = self.parse_form(body)
+            if path == b'/cfg' and method == b'POST':
+                p = self.parse_form(self._body(req, hdr_end))
+                self._page = None  # Before any field: a bad value may raise mid-update
                 if 'n' in p: self.config['experiment_name'] = p['n']
                 if 'c' in p: self.config['correlation'] = max(-1, min(1, float(p['c'])))
                 if 'bt' in p: self.config['basal_temp'] = float(p['bt'])
@@ -239,11 +352,11 @@ n();setInterval(function(){fetch('/t').then(r=>r.text()).then(d=>{document.getEl
                 if 'ud' in p: self.config['us_duration'] = int(p['ud'])
                 if 'hd' in p: self.config['heat_duration'] = int(p['hd'])
                 if 'ut' in p: self.config['us_type'] = p['ut']
-                return "HTTP/1.1 302 Found\r\nLocation:/\r\n\r\n"
+                return self._REDIRECT
             
-            if path == '/scfg' and method == 'POST':
-                body = req.split('\r\n\r\n')[1] if '\r\n\r\n' in req else ""
-                p = self.parse_form(body)
+            if path == b'/scfg' and method == b'POST':
+                p = self.parse_form(self._body(req, hdr_end))
+                self._page = None  # Before any field: a bad value may raise mid-update
                 if 'sn' in p: self.stress_config['experiment_name'] = p['sn']
                 if 'tt' in p: self.stress_config['training_temp'] = float(p['tt'])
                 if 'ct' in p: self.stress_config['challenge_temp'] = float(p['ct'])
@@ -253,32 +366,28 @@ n();setInterval(function(){fetch('/t').then(r=>r.text()).then(d=>{document.getEl
                 if 'vi' in p: self.stress_config['us_vib_intensity'] = int(p['vi'])
                 if 'sut' in p: self.stress_config['us_type'] = p['sut']
                 if 'nt' in p: self.stress_config['notes'] = p['nt']
-                return "HTTP/1.1 302 Found\r\nLocation:/\r\n\r\n"
+                return self._REDIRECT
             
-            if path == '/stress' and method == 'POST':
+            if path == b'/stress' and method == b'POST':
                 if self.time_set:
                     self.stress_test_started = True
-                    gc.collect()
                     html = self.get_done_html(mode='stress')
-                    return f"HTTP/1.1 200 OK\r\nContent-Type:text/html\r\n\r\n{html}"
-                return "HTTP/1.1 302 Found\r\nLocation:/\r\n\r\n"
+                    return self._OK_HTML + html.encode('utf-8')
+                return self._REDIRECT
             
-            if path == '/start' and method == 'POST':
+            if path == b'/start' and method == b'POST':
                 if self.time_set:
                     self.experiment_started = True
-                    gc.collect()
                     html = self.get_done_html()
-                    return f"HTTP/1.1 200 OK\r\nContent-Type:text/html\r\n\r\n{html}"
-                return "HTTP/1.1 302 Found\r\nLocation:/\r\n\r\n"
+                    return self._OK_HTML + html.encode('utf-8')
+                return self._REDIRECT
             
-            # Default: show main page
-            gc.collect()
-            html = self.get_html()
-            return f"HTTP/1.1 200 OK\r\nContent-Type:text/html\r\n\r\n{html}"
+            # Default: show main page (cached; gzipped if the browser accepts it)
+            return self.get_page(req.find(b'gzip', 0, hdr_end if hdr_end >= 0 else len(req)) >= 0)
         
         except Exception as e:
             print(f"[Srv] Err: {e}")
-            return "HTTP/1.1 500 Error\r\n\r\nError"
+            return self._ERROR
     
     def start_server(self, port=80):
         gc.collect()
@@ -292,7 +401,9 @@ n();setInterval(function(){fetch('/t').then(r=>r.text()).then(d=>{document.getEl
         self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self.socket.bind(('', port))
         self.socket.listen(2)
-        self.socket.settimeout(1.0)
+        self.socket.settimeout(1.0)  # accept() safety net; poll() does the waiting
+        self._poller = select.poll()
+        self._poller.register(self.socket, select.POLLIN)
         print(f"[Server] Port {port} ready")
     
     def stop_server(self):
@@ -300,6 +411,7 @@ n();setInterval(function(){fetch('/t').then(r=>r.text()).then(d=>{document.getEl
             try:
                 self.socket.close()
                 self.socket = None
+                self._poller = None
             except:
                 pass
     
@@ -307,18 +419,20 @@ n();setInterval(function(){fetch('/t').then(r=>r.text()).then(d=>{document.getEl
         print("[Server] Waiting for config...")
         while not self.experiment_started and not self.stress_test_started:
             try:
+                # Sleep in poll() until a client connects instead of waking every second
+                if not self._poller.poll(30000):
+                    continue
                 client, _ = self.socket.accept()
                 client.settimeout(5.0)
                 try:
-                    req = client.recv(2048).decode('utf-8')
+                    req = client.recv(2048)
                     if req:
-                        resp = self.handle(req)
-                        client.send(resp.encode('utf-8'))
+                        client.sendall(self.handle(req))
                 except Exception as e:
                     print(f"[Srv] {e}")
                 finally:
                     client.close()
-                gc.collect()
+                    gc.collect()  # The one collection per request
             except OSError:
                 pass
             except Exception as e: